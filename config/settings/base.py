@@ -139,6 +139,9 @@ SITE_ID = 1
 STATIC_URL = '/static/'
 STATIC_ROOT = str(BASE_DIR / 'staticfiles')
 
+MEDIA_URL = '/mediafiles/'
+MEDIA_ROOT = str(BASE_DIR / 'mediafiles')
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -233,8 +236,74 @@ CELERY_BEAT_SCHEDULE = {
     'detect-suspicious-activities': {
         'task': 'core_apps.accounts.tasks.detect_suspicious_activities',
     },
+    'snapshot-account-balances': {
+        'task': 'core_apps.accounts.tasks.snapshot_account_balances',
+    },
+    'capitalize-monthly-interest': {
+        'task': 'core_apps.accounts.tasks.capitalize_monthly_interest',
+    },
+    'roll-up-account-summaries': {
+        'task': 'core_apps.accounts.tasks.roll_up_account_summaries',
+    },
+    'generate-month-end-statements': {
+        'task': 'core_apps.accounts.tasks.generate_month_end_statements',
+    },
+    'relay-outbox-emails': {
+        'task': 'core_apps.common.tasks.relay_outbox',
+    },
+    'purge-sent-outbox-emails': {
+        'task': 'core_apps.common.tasks.purge_sent_outbox_emails',
+    },
+    'purge-expired-intents': {
+        'task': 'core_apps.accounts.tasks.purge_expired_intents',
+    },
+    'purge-expired-idempotency-keys': {
+        'task': 'core_apps.common.tasks.purge_expired_idempotency_keys',
+    },
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'redis': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': getenv('REDIS_CACHE_URL', 'redis://redis:6379/1'),
+        'OPTIONS': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+        },
+    },
 }
 
+IDEMPOTENCY_CACHE = 'redis'
+IDEMPOTENCY_KEY_TTL = timedelta(hours=24)
+IDEMPOTENCY_LOCK_TIMEOUT = timedelta(seconds=30)
+IDEMPOTENCY_POLL_INTERVAL = 0.1
+
+TRANSACTION_INTENT_MAX_AGE = timedelta(minutes=10)
+TRANSACTION_INTENT_CACHE = 'redis'
+
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_BACKOFF = timedelta(minutes=1)
+OUTBOX_EMAIL_BACKEND = getenv('OUTBOX_EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+OUTBOX_DIGEST_WINDOW = timedelta(hours=1)
+OUTBOX_SENT_RETENTION = timedelta(days=7)
+
+VELOCITY_COUNTERS_BACKEND = getenv('VELOCITY_COUNTERS_BACKEND', 'redis')
+VELOCITY_REDIS_CACHE = 'redis'
+VELOCITY_BUCKETS = 60
+
+INTEREST_TIERS_CACHE = 'redis'
+INTEREST_TIERS_CACHE_TIMEOUT = timedelta(hours=1)
+
+ROLLUP_LOCK_CACHE = 'redis'
+
+ACCOUNT_NUMBER_BLOCK_SIZE = 100
+CARD_NUMBER_BLOCK_SIZE = 100
+
+ONBOARDING_CHUNK_SIZE = 1000
+
 CLOUDINARY_CLOUD_NAME = getenv('CLOUDINARY_CLOUD_NAME')
 CLOUDINARY_API_KEY = getenv('CLOUDINARY_API_KEY')
 CLOUDINARY_API_SECRET = getenv('CLOUDINARY_API_SECRET')
@@ -0,0 +1,16 @@
+from .local import * #noqa
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'redis',
+    },
+}
+
+VELOCITY_COUNTERS_BACKEND = 'memory'
+
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+OUTBOX_EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
@@ -2,7 +2,8 @@ from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth import get_user_model
 
-from .models import BankAccount, Transaction
+from .models import AccountDailySummary, BankAccount, InterestAccrual, InterestTier, LedgerEntry, StatementArtifact, \
+    Transaction
 
 User = get_user_model()
 
@@ -95,3 +96,71 @@ class TransactionAdmin(admin.ModelAdmin):
     
     def has_change_permission(self, request, obj=None):
         return request.user.is_superuser
+
+
+@admin.register(LedgerEntry)
+class LedgerEntryAdmin(admin.ModelAdmin):
+    list_display = ['account', 'sequence', 'amount', 'balance_after', 'transaction', 'created_at']
+    search_fields = ['account__account_number']
+    readonly_fields = ['id', 'account', 'transaction', 'sequence', 'amount', 'balance_after', 'created_at', 
+                       'updated_at']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('account__user', 'transaction')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_delete_permission(self, request, obj = ...):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(StatementArtifact)
+class StatementArtifactAdmin(admin.ModelAdmin):
+    list_display = ['account', 'period', 'ledger_sequence', 'file', 'created_at']
+    list_filter = ['period']
+    search_fields = ['account__account_number']
+    readonly_fields = ['id', 'account', 'period', 'ledger_sequence', 'file', 'created_at', 'updated_at']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(InterestTier)
+class InterestTierAdmin(admin.ModelAdmin):
+    list_display = ['minimum_balance', 'annual_rate', 'updated_at']
+
+
+@admin.register(InterestAccrual)
+class InterestAccrualAdmin(admin.ModelAdmin):
+    list_display = ['account', 'accrual_date', 'balance', 'annual_rate', 'amount', 'residual', 'capitalized_at']
+    list_filter = ['accrual_date', 'residual']
+    search_fields = ['account__account_number']
+    readonly_fields = ['id', 'account', 'accrual_date', 'balance', 'annual_rate', 'amount', 'residual',
+                       'capitalized_at', 'created_at', 'updated_at']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(AccountDailySummary)
+class AccountDailySummaryAdmin(admin.ModelAdmin):
+    list_display = ['account', 'date', 'transaction_type', 'credit_count', 'credit_amount', 'debit_count',
+                    'debit_amount', 'closing_balance']
+    list_filter = ['date', 'transaction_type']
+    search_fields = ['account__account_number']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -5,3 +5,6 @@ class AccountsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core_apps.accounts"
     verbose_name = _("Accounts")
+
+    def ready(self):
+        import core_apps.accounts.signals
@@ -1,97 +1,66 @@
-from typing import List
+from typing import Any, List, Tuple
 from django.conf import settings
-from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
 from django.utils.translation import gettext_lazy as _
 from loguru import logger
 
+from core_apps.common.emails import build_email
+from core_apps.common.models import OutboxEmail
+from core_apps.common.outbox import enqueue_emails, outbox_email
+
 from .models import BankAccount
 
+def account_creation_email(user: 'User', bank_account: BankAccount) -> OutboxEmail:
+    profile = getattr(user, 'profile', None)
+    return outbox_email('emails/account_created.html', _('You new bank account has been created'), user.email, {
+        'user': {
+            'full_name': user.full_name,
+            'username': user.username,
+            'get_security_question_display': user.get_security_question_display(),
+            'profile': {'identification_type': profile.identification_type} if profile else None,
+        },
+        'account': {
+            'account_number': bank_account.account_number,
+            'get_account_currency_display': bank_account.get_account_currency_display(),
+            'get_account_type_display': bank_account.get_account_type_display(),
+        },
+    })
+
 def send_account_creation_email(user: 'User', bank_account: BankAccount) -> None:
-    subject = _('You new bank account has been created')
-    context = {
-        'user': user,
-        'account': bank_account,
-        'site_name': settings.SITE_NAME,
-    }
-    html_content = render_to_string('emails/account_created.html', context)
-    text_content = strip_tags(html_content)
-    from_email = settings.DEFAULT_FROM_EMAIL
-    recipient_list = [user.email]
-    msg = EmailMultiAlternatives(subject, text_content, from_email, recipient_list)
-    msg.attach_alternative(html_content, 'text/html')
-    try:
-        msg.send()
-        logger.info(f'Account created email sent to {user.email}')
-    except Exception as e:
-        logger.error(f'Failed to send account created email to {user.email}, Error: {e}')
+    enqueue_emails([account_creation_email(user, bank_account)])
+    logger.info(f'Account created email queued for {user.email}')
 
 def send_full_activation_email(bank_account: BankAccount) -> None:
-    subject = _('Your bank account is now fully activated')
-    context = {
-        'account': bank_account,
-        'site_name': settings.SITE_NAME,
-    }
-    html_content = render_to_string('emails/bank_account_activated.html', context)
-    text_content = strip_tags(html_content)
-    from_email = settings.DEFAULT_FROM_EMAIL
-    recipient_list = [bank_account.user.email]
-    msg = EmailMultiAlternatives(subject, text_content, from_email, recipient_list)
-    msg.attach_alternative(html_content, 'text/html')
-    try:
-        msg.send()
-        logger.info(f'Account activation email sent to {bank_account.user.email}')
-    except Exception as e:
-        logger.error(f'Failed to send account activated email to {bank_account.user.email}, Error: {e}')
+    enqueue_emails([outbox_email('emails/bank_account_activated.html',
+                                 _('Your bank account is now fully activated'), bank_account.user.email, {
+        'account': {
+            'account_number': bank_account.account_number,
+            'user': {'full_name': bank_account.user.full_name},
+        },
+    })])
+    logger.info(f'Account activation email queued for {bank_account.user.email}')
 
 def send_deposite_email(user, user_email, amount, currency, new_balance, account_number) -> None:
-    subject = _('Deposit Confirmation')
-    context = {
-        'user': user,
+    enqueue_emails([outbox_email('emails/deposit_confirmation.html', _('Deposit Confirmation'), user_email, {
+        'user': {'full_name': user.full_name},
         'amount': amount,
         'currency': currency,
         'new_balance': new_balance,
         'account_number': account_number,
-        'site_name': settings.SITE_NAME,
-    }
-    html_content = render_to_string('emails/deposit_confirmation.html', context)
-    text_content = strip_tags(html_content)
-    from_email = settings.DEFAULT_FROM_EMAIL
-    recipient_list = [user_email]
-    msg = EmailMultiAlternatives(subject, text_content, from_email, recipient_list)
-    msg.attach_alternative(html_content, 'text/html')
-    try:
-        msg.send()
-        logger.info(f'Deposit confirmation email sent to {user_email}')
-    except Exception as e:
-        logger.error(f'Failed to send deposit confirmation email to {user_email}, Error: {e}')
+    }, digestible=True)])
+    logger.info(f'Deposit confirmation email queued for {user_email}')
 
 def send_withdrawal_email(user, user_email, amount, currency, new_balance, account_number) -> None:
-    subject = _('Withdrawal Confirmation')
-    context = {
-        'user': user,
+    enqueue_emails([outbox_email('emails/withdraw_confirmation.html', _('Withdrawal Confirmation'), user_email, {
+        'user': {'full_name': user.full_name},
         'amount': amount,
         'currency': currency,
         'new_balance': new_balance,
         'account_number': account_number,
-        'site_name': settings.SITE_NAME,
-    }
-    html_content = render_to_string('emails/withdraw_confirmation.html', context)
-    text_content = strip_tags(html_content)
-    from_email = settings.DEFAULT_FROM_EMAIL
-    recipient_list = [user_email]
-    msg = EmailMultiAlternatives(subject, text_content, from_email, recipient_list)
-    msg.attach_alternative(html_content, 'text/html')
-    try:
-        msg.send()
-        logger.info(f'Withdrawal confirmation email sent to {user_email}')
-    except Exception as e:
-        logger.error(f'Failed to send withdrawal confirmation email to {user_email}, Error: {e}')
+    }, digestible=True)])
+    logger.info(f'Withdrawal confirmation email queued for {user_email}')
 
-def send_transfer_email(sender, sender_email, receiver, receiver_email, amount, currency, 
-                sender_new_balance, receiver_new_balance, sender_account_number, receiver_account_number) -> None:
-    from_email = settings.DEFAULT_FROM_EMAIL
+def transfer_emails(sender, sender_email, receiver, receiver_email, amount, currency, sender_new_balance,
+                    receiver_new_balance, sender_account_number, receiver_account_number) -> List[OutboxEmail]:
     subject = _('Transfer Notification')
     common_context = {
         'amount': amount,
@@ -100,38 +69,30 @@ def send_transfer_email(sender, sender_email, receiver, receiver_email, amount,
         'receiver_account_number': receiver_account_number,
         'sender_name': sender.full_name,
         'receiver_name': receiver.full_name,
-        'site_name': settings.SITE_NAME,
     }
-    
-    # Send notification email to sender
-    sender_context = {
-        **common_context,
-        'user': sender,
-        'is_sender': True,
-        'new_balance': sender_new_balance,
-    }
-    html_content = render_to_string('emails/transfer_notification.html', sender_context)
-    text_content = strip_tags(html_content)
-    sender_msg = EmailMultiAlternatives(subject, text_content, from_email, [sender_email])
-    sender_msg.attach_alternative(html_content, 'text/html')
+    return [
+        # Notification email to sender
+        outbox_email('emails/transfer_notification.html', subject, sender_email, {
+            **common_context,
+            'user': {'full_name': sender.full_name},
+            'is_sender': True,
+            'new_balance': sender_new_balance,
+        }, digestible=True),
+        # Confirmation email to receiver
+        outbox_email('emails/transfer_notification.html', subject, receiver_email, {
+            **common_context,
+            'user': {'full_name': receiver.full_name},
+            'is_sender': False,
+            'new_balance': receiver_new_balance,
+        }, digestible=True),
+    ]
 
-    # Send confirmation email to receiver
-    receiver_context = {
-        **common_context,
-        'user': receiver,
-        'is_sender': False,
-        'new_balance': receiver_new_balance,
-    }
-    html_content = render_to_string('emails/transfer_notification.html', receiver_context)
-    text_content = strip_tags(html_content)
-    receiver_msg = EmailMultiAlternatives(subject, text_content, from_email, [receiver_email])
-    receiver_msg.attach_alternative(html_content, 'text/html')
-    try:
-        sender_msg.send()
-        receiver_msg.send()
-        logger.info(f'Transfer notification email sent to sender: {sender_email} and receiver: {receiver_email}')
-    except Exception as e:
-        logger.error(f'Failed to send transfer notification emails, Error: {e}')
+def send_transfer_email(sender, sender_email, receiver, receiver_email, amount, currency, 
+                sender_new_balance, receiver_new_balance, sender_account_number, receiver_account_number) -> None:
+    enqueue_emails(transfer_emails(sender, sender_email, receiver, receiver_email, amount, currency,
+                                   sender_new_balance, receiver_new_balance, sender_account_number,
+                                   receiver_account_number))
+    logger.info(f'Transfer notification email queued for sender: {sender_email} and receiver: {receiver_email}')
 
 
 def send_transfer_otp_email(email, otp):
@@ -141,31 +102,22 @@ def send_transfer_otp_email(email, otp):
         'expiry_time': settings.OTP_EXPIRATION,
         'site_name': settings.SITE_NAME,
     }
-    html_content = render_to_string('emails/transfer_otp_email.html', context)
-    text_content = strip_tags(html_content)
-    from_email = settings.DEFAULT_FROM_EMAIL
-    recipient_list = [email]
-    msg = EmailMultiAlternatives(subject, text_content, from_email, recipient_list)
-    msg.attach_alternative(html_content, 'text/html')
+    msg = build_email(subject, 'emails/transfer_otp_email.html', context, [email])
     try:
         msg.send()
         logger.info(f'OTP email sent successfully to {email}')
     except Exception as e:
         logger.error(f'Failed to send OTP email to {email}, Error: {e}')
 
-def send_transaction_pdf(user, start_date, end_date, pdf) -> None:
+def send_transaction_pdf(user, start_date, end_date, attachments: List[Tuple[str, Any]]) -> None:
     subject = _('Your translations history PDF')
     context = {
         'user': user,
         'site_name': settings.SITE_NAME,
     }
-    html_content = render_to_string('emails/transactions_history_pdf.html', context)
-    text_content = strip_tags(html_content)
-    from_email = settings.DEFAULT_FROM_EMAIL
-    recipient_list = [user.email]
-    email = EmailMultiAlternatives(subject, text_content, from_email, recipient_list)
-    email.attach_alternative(html_content, 'text/html')
-    email.attach(f'transactions_from_{start_date}_to_{end_date}.pdf', pdf, 'application/pdf')
+    email = build_email(subject, 'emails/transactions_history_pdf.html', context, [user.email])
+    for filename, pdf in attachments:
+        email.attach(filename, pdf.read(), 'application/pdf')
 
     try:
         email.send()
@@ -175,16 +127,11 @@ def send_transaction_pdf(user, start_date, end_date, pdf) -> None:
 
 def send_suspicious_activity_alert(suspicious_activities: List[str]) -> int:
     subject = _('Suspicious Activity Alert')
-    from_email = settings.DEFAULT_FROM_EMAIL
-    recipient_list = [settings.ADMIN_EMAIL]
     context = {
         'suspicious_activities': suspicious_activities,
         'site_name': settings.SITE_NAME,
     }
-    html_content = render_to_string('emails/suspicious_activity_alert.html', context)
-    text_content = strip_tags(html_content)
-    email = EmailMultiAlternatives(subject, text_content, from_email, recipient_list)
-    email.attach_alternative(html_content, 'text/html')
+    email = build_email(subject, 'emails/suspicious_activity_alert.html', context, [settings.ADMIN_EMAIL])
     try:
         email.send()
         logger.info(f'Suspicious activity alert email sent to {settings.ADMIN_EMAIL}')
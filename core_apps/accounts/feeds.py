@@ -0,0 +1,54 @@
+from typing import Any, Dict, Iterable, List
+
+from django.contrib.auth import get_user_model
+from django.db.models import QuerySet
+from rest_framework.fields import DateTimeField
+
+from .models import Transaction
+
+User = get_user_model()
+
+TRANSACTION_FEED_FIELDS = (
+    'id', 'amount', 'description', 'transaction_status', 'transaction_type', 'created_at',
+    'sender__first_name', 'sender__middle_name', 'sender__last_name',
+    'receiver__first_name', 'receiver__middle_name', 'receiver__last_name',
+    'sender_account__account_number', 'receiver_account__account_number',
+)
+
+TRANSACTION_TYPE_LABELS = {value: str(label) for value, label in Transaction.TransactionType.choices}
+TRANSACTION_STATUS_LABELS = {value: str(label) for value, label in Transaction.TransactionStatus.choices}
+
+TRANSACTION_EXPORT_COLUMNS = ('id', 'created_at', 'transaction_type', 'transaction_status', 'amount', 'description',
+                              'sender', 'sender_account', 'receiver', 'receiver_account')
+
+def project_transactions(queryset: QuerySet) -> QuerySet:
+    return queryset.values(*TRANSACTION_FEED_FIELDS)
+
+def party_name(row: Dict[str, Any], party: str) -> Any:
+    first_name = row[f'{party}__first_name']
+    if first_name is None:
+        return None
+    return User.compose_full_name(first_name, row[f'{party}__middle_name'], row[f'{party}__last_name'])
+
+CREATED_AT_FIELD = DateTimeField()
+
+def transaction_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'id': str(row['id']),
+        'amount': str(row['amount']),
+        'description': row['description'],
+        'transaction_status': TRANSACTION_STATUS_LABELS.get(row['transaction_status'], row['transaction_status']),
+        'transaction_type': TRANSACTION_TYPE_LABELS.get(row['transaction_type'], row['transaction_type']),
+        'created_at': CREATED_AT_FIELD.to_representation(row['created_at']),
+        'sender': party_name(row, 'sender'),
+        'receiver': party_name(row, 'receiver'),
+        'sender_account': row['sender_account__account_number'],
+        'receiver_account': row['receiver_account__account_number'],
+    }
+
+def transaction_feed(rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Build the same payload as ``TransactionSerializer`` from projected rows,
+    without instantiating models or running DRF fields per row.
+    """
+    return [transaction_row(row) for row in rows]
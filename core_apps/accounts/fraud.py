@@ -0,0 +1,57 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import List, Optional
+
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from .models import Transaction
+
+def window_transactions(time_threshold: datetime):
+    return Transaction.objects.filter(created_at__gte=time_threshold).order_by()
+
+def large_transactions(threshold: Decimal, time_threshold: datetime):
+    return window_transactions(time_threshold).filter(amount__gte=threshold).values_list('amount', 'user__email')
+
+def frequent_users(threshold: int, time_threshold: datetime):
+    return window_transactions(time_threshold).filter(user__isnull=False).values('user__email').annotate(
+        transactions_count=Count('id')).filter(transactions_count__gte=threshold).values_list(
+        'user__email', 'transactions_count')
+
+def account_flows(time_threshold: datetime, party: str):
+    return window_transactions(time_threshold).filter(**{f'{party}__isnull': False}).values(
+        account_number=F(f'{party}__account_number')).annotate(total=Sum('amount')).values_list(
+        'account_number', 'total')
+
+def detect_suspicious(large_threshold: Decimal, frequent_threshold: int, time_window: timedelta,
+                      now: Optional[datetime] = None) -> List[str]:
+    """
+    Evaluate the suspicious activity rules over the transactions created in the
+    last ``time_window``. Each rule is one grouped query with the user email or
+    account number joined in, so the number of queries does not grow with the
+    number of users or accounts.
+    """
+    time_threshold = (now or timezone.now()) - time_window
+    suspicious_activities = []
+
+    # Detect large transactions activity
+    for amount, email in large_transactions(large_threshold, time_threshold):
+        suspicious_activities.append(f'Large transaction detected: Amount: {amount}, by user {email}')
+
+    # Detect frequent transactions activity
+    for email, transactions_count in frequent_users(frequent_threshold, time_threshold):
+        suspicious_activities.append(f'Frequent transaction detected: {transactions_count}, by user {email}')
+
+    # Detect unusual account balance change
+    balance_changes = defaultdict(Decimal)
+    for account_number, total_sent in account_flows(time_threshold, 'sender_account'):
+        balance_changes[account_number] += total_sent
+    for account_number, total_received in account_flows(time_threshold, 'receiver_account'):
+        balance_changes[account_number] -= total_received
+    for account_number, total_change in balance_changes.items():
+        if abs(total_change) > large_threshold:
+            suspicious_activities.append(
+                f'Large balance change detected: Total change: {total_change}, by account {account_number}'
+            )
+    return suspicious_activities
@@ -0,0 +1,84 @@
+from functools import partial
+from typing import Any, Dict
+from uuid import uuid4
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from loguru import logger
+
+from .models import ConsumedIntent
+
+INTENT_SALT = 'core_apps.accounts.intents'
+WITHDRAWAL_INTENT = 'withdrawal'
+TRANSFER_INTENT = 'transfer'
+BATCH_TRANSFER_INTENT = 'batch_transfer'
+
+class IntentError(Exception):
+    pass
+
+def intent_label(kind: str) -> str:
+    return kind.replace('_', ' ')
+
+def issue_intent(user, kind: str, data: Dict[str, Any]) -> str:
+    """
+    Return a signed, timestamped token carrying a pending ``kind`` operation
+    of ``user`` between the initiate and verify steps, so no server-side
+    session has to hold it.
+    """
+    payload = {'id': uuid4().hex, 'kind': kind, 'user': str(user.pk), 'data': data}
+    return signing.dumps(payload, salt=INTENT_SALT, compress=True)
+
+def read_intent(token: str, user, kind: str) -> Dict[str, Any]:
+    if not token:
+        raise IntentError(f'No pending {intent_label(kind)} found. Please initiate a {intent_label(kind)} first')
+    try:
+        payload = signing.loads(token, salt=INTENT_SALT, max_age=settings.TRANSACTION_INTENT_MAX_AGE)
+    except signing.SignatureExpired:
+        raise IntentError(f'The {intent_label(kind)} has expired. Please initiate it again')
+    except signing.BadSignature:
+        raise IntentError('Invalid intent')
+    if payload.get('kind') != kind or payload.get('user') != str(user.pk):
+        raise IntentError('Invalid intent')
+    return payload
+
+def consume_intent(token: str, user, kind: str) -> Dict[str, Any]:
+    """
+    Verify ``token`` and mark its intent used, so a token can complete at most
+    one operation however many API instances it is replayed against. The mark
+    is a ``ConsumedIntent`` row written in the caller's database transaction,
+    so an operation that fails and rolls back leaves its intent usable for a
+    retry. Committed marks are copied to the cache, which is checked first and
+    lets replays fail without touching the table.
+    """
+    payload = read_intent(token, user, kind)
+    key = f'intent:{payload["id"]}'
+    max_age = settings.TRANSACTION_INTENT_MAX_AGE
+    cache = caches[settings.TRANSACTION_INTENT_CACHE]
+    try:
+        used = cache.get(key) is not None
+    except Exception as e:
+        logger.warning(f'Intent cache unavailable, checking the database only: {e}')
+        used = False
+    if not used:
+        try:
+            with transaction.atomic():
+                ConsumedIntent.objects.create(intent_id=payload['id'], kind=kind, expires_at=timezone.now() + max_age)
+        except IntegrityError:
+            used = True
+    if used:
+        raise IntentError(f'This {intent_label(kind)} was already completed')
+    transaction.on_commit(partial(mark_intent_used, key, max_age.total_seconds()))
+    return payload['data']
+
+def mark_intent_used(key: str, timeout: float) -> None:
+    try:
+        caches[settings.TRANSACTION_INTENT_CACHE].set(key, 1, timeout=timeout)
+    except Exception as e:
+        logger.warning(f'Intent cache unavailable, replays will be rejected by the database: {e}')
+
+def purge_consumed_intents() -> int:
+    deleted, _ = ConsumedIntent.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
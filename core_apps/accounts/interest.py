@@ -0,0 +1,174 @@
+from datetime import date
+from decimal import Decimal, ROUND_DOWN, ROUND_HALF_UP
+from typing import Callable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from loguru import logger
+
+from .models import BankAccount, InterestAccrual, InterestTier
+from .posting import post_interest_batch
+from .queries import next_month
+
+INTEREST_TIERS_CACHE_KEY = 'interest:tiers'
+DAYS_IN_YEAR = Decimal(365)
+ACCRUAL_PRECISION = Decimal('.000001')
+CENTS = Decimal('.01')
+INTEREST_SHARD_SIZE = 5000
+INTEREST_CHUNK_SIZE = 500
+CAPITALIZED_INTEREST_DESCRIPTION = 'Interest for {period:%B %Y} capitalized to account {{account_number}}'
+
+Tiers = List[Tuple[Decimal, Decimal]]
+ProgressCallback = Callable[[int, int, Decimal], None]
+
+def load_interest_tiers() -> Tiers:
+    return list(InterestTier.objects.order_by('-minimum_balance').values_list('minimum_balance', 'annual_rate'))
+
+def interest_tiers() -> Tiers:
+    """
+    Return the ``(minimum_balance, annual_rate)`` tiers, highest first. The
+    table is cached until a tier changes and read directly whenever the cache
+    is unreachable.
+    """
+    cache = caches[settings.INTEREST_TIERS_CACHE]
+    try:
+        tiers = cache.get(INTEREST_TIERS_CACHE_KEY)
+        if tiers is not None:
+            return tiers
+    except Exception as e:
+        logger.warning(f'Interest tier cache unavailable, reading tiers from the database: {e}')
+        return load_interest_tiers()
+    tiers = load_interest_tiers()
+    try:
+        cache.set(INTEREST_TIERS_CACHE_KEY, tiers, timeout=settings.INTEREST_TIERS_CACHE_TIMEOUT.total_seconds())
+    except Exception as e:
+        logger.warning(f'Interest tier cache unavailable, tiers not cached: {e}')
+    return tiers
+
+def clear_interest_tiers() -> None:
+    try:
+        caches[settings.INTEREST_TIERS_CACHE].delete(INTEREST_TIERS_CACHE_KEY)
+    except Exception as e:
+        logger.warning(f'Interest tier cache unavailable, tiers not invalidated: {e}')
+
+def tiered_annual_rate(balance: Decimal, tiers: Optional[Tiers] = None) -> Decimal:
+    for minimum_balance, annual_rate in (interest_tiers() if tiers is None else tiers):
+        if balance >= minimum_balance:
+            return annual_rate
+    return Decimal(0)
+
+def daily_accrual(balance: Decimal, tiers: Optional[Tiers] = None) -> Tuple[Decimal, Decimal]:
+    annual_rate = tiered_annual_rate(balance, tiers)
+    amount = (annual_rate / DAYS_IN_YEAR * balance).quantize(ACCRUAL_PRECISION, rounding=ROUND_HALF_UP)
+    return annual_rate, amount
+
+def accrue_account_interest(account: BankAccount, accrual_date: date) -> Decimal:
+    annual_rate, amount = daily_accrual(Decimal(account.account_balance))
+    accrual, _ = InterestAccrual.objects.get_or_create(account=account, accrual_date=accrual_date, residual=False,
+                                                       defaults={
+        'balance': account.account_balance,
+        'annual_rate': annual_rate,
+        'amount': amount,
+    })
+    return accrual.amount
+
+def saving_accounts():
+    return BankAccount.objects.filter(account_type=BankAccount.BankAccountType.SAVING)
+
+def interest_shards(shard_size: int = INTEREST_SHARD_SIZE) -> List[Tuple[str, str, int]]:
+    """
+    Split the savings accounts into contiguous ``(first_id, last_id, size)`` id
+    ranges of at most ``shard_size`` accounts, reading only the primary key
+    index.
+    """
+    shards = []
+    first_id, last_id, size = None, None, 0
+    for account_id in saving_accounts().order_by('id').values_list('id', flat=True).iterator(chunk_size=shard_size):
+        first_id = first_id or account_id
+        last_id = account_id
+        size += 1
+        if size == shard_size:
+            shards.append((str(first_id), str(last_id), size))
+            first_id, size = None, 0
+    if first_id:
+        shards.append((str(first_id), str(last_id), size))
+    return shards
+
+def account_chunks(first_id: str, last_id: str, fields: Tuple[str, ...], chunk_size: int):
+    accounts = saving_accounts().filter(id__gte=first_id, id__lte=last_id).order_by('id').values_list('id', *fields)
+    cursor = None
+    while True:
+        rows = list((accounts.filter(id__gt=cursor) if cursor else accounts)[:chunk_size])
+        if not rows:
+            return
+        yield rows
+        cursor = rows[-1][0]
+
+def accrue_interest_range(first_id: str, last_id: str, accrual_date: date, chunk_size: int = INTEREST_CHUNK_SIZE,
+                          on_chunk: Optional[ProgressCallback] = None) -> Tuple[int, int, Decimal]:
+    """
+    Record one day of interest for the savings accounts in ``[first_id, last_id]``
+    as ``InterestAccrual`` rows, one bulk insert per chunk. Balances are not
+    touched and no transactions are written. Re-running a date is a no-op.
+    Returns the number of accounts processed and accrued and the total accrued.
+    """
+    tiers = interest_tiers()
+    processed, accrued, total = 0, 0, Decimal(0)
+    for rows in account_chunks(first_id, last_id, ('account_balance',), chunk_size):
+        accruals = []
+        for account_id, balance in rows:
+            annual_rate, amount = daily_accrual(balance, tiers)
+            if amount > 0:
+                accruals.append(InterestAccrual(account_id=account_id, accrual_date=accrual_date, balance=balance,
+                                                annual_rate=annual_rate, amount=amount))
+        InterestAccrual.objects.bulk_create(accruals, ignore_conflicts=True)
+        processed += len(rows)
+        accrued += len(accruals)
+        total += sum((accrual.amount for accrual in accruals), Decimal(0))
+        if on_chunk:
+            on_chunk(processed, accrued, total)
+    return processed, accrued, total
+
+def capitalize_interest_range(first_id: str, last_id: str, period: date, chunk_size: int = INTEREST_CHUNK_SIZE,
+                              on_chunk: Optional[ProgressCallback] = None) -> Tuple[int, int, Decimal]:
+    """
+    Post the interest accrued up to the end of the ``period`` month as a single
+    INTEREST transaction per account in ``[first_id, last_id]``, and mark the
+    accruals of the credited accounts capitalized in the same database
+    transaction. Totals are rounded down to cents. The sub-cent remainder is
+    carried into the next month as a residual accrual, and accounts whose total
+    is still under a cent keep their accruals pending. Returns the number of
+    accounts processed and credited and the total interest posted.
+    """
+    description = CAPITALIZED_INTEREST_DESCRIPTION.format(period=period)
+    carry_date = next_month(period)
+    started = timezone.now()
+    processed, credited, total = 0, 0, Decimal(0)
+    for rows in account_chunks(first_id, last_id, (), chunk_size):
+        account_ids = [account_id for account_id, in rows]
+        with transaction.atomic():
+            pending = InterestAccrual.objects.filter(account_id__in=account_ids, accrual_date__lt=carry_date,
+                                                     capitalized_at__isnull=True, created_at__lte=started)
+            accrued = dict(pending.order_by().values('account_id').annotate(total=Sum('amount'))
+                           .values_list('account_id', 'total'))
+            posted = {account_id: amount.quantize(CENTS, rounding=ROUND_DOWN)
+                      for account_id, amount in accrued.items()}
+            posted = {account_id: amount for account_id, amount in posted.items() if amount > 0}
+            count, amount = post_interest_batch(list(posted), lambda account: posted[account.id],
+                                                description=description)
+            now = timezone.now()
+            pending.filter(account_id__in=list(posted)).update(capitalized_at=now, updated_at=now)
+            InterestAccrual.objects.bulk_create([
+                InterestAccrual(account_id=account_id, accrual_date=carry_date, balance=Decimal(0),
+                                annual_rate=Decimal(0), amount=accrued[account_id] - interest, residual=True)
+                for account_id, interest in posted.items() if accrued[account_id] > interest
+            ])
+        processed += len(account_ids)
+        credited += count
+        total += amount
+        if on_chunk:
+            on_chunk(processed, credited, total)
+    return processed, credited, total
@@ -0,0 +1,59 @@
+import time
+from decimal import Decimal
+from typing import Any, Callable, Dict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.utils.html import strip_tags
+
+from core_apps.common.emails import render_email
+
+SAMPLE_CONTEXTS = {
+    'emails/deposit_confirmation.html': {
+        'user': {'full_name': 'Jane Doe'},
+        'amount': Decimal('125000.50'),
+        'currency': 'USD',
+        'new_balance': Decimal('987654.25'),
+        'account_number': '4000123456789012',
+    },
+    'emails/transfer_notification.html': {
+        'user': {'full_name': 'Jane Doe'},
+        'is_sender': True,
+        'amount': Decimal('2500.00'),
+        'currency': 'USD',
+        'new_balance': Decimal('985154.25'),
+        'sender_name': 'Jane Doe',
+        'receiver_name': 'John Roe',
+        'sender_account_number': '4000123456789012',
+        'receiver_account_number': '4000987654321098',
+    },
+}
+
+def render_per_message(template_name: str, context: Dict[str, Any]) -> None:
+    html_content = render_to_string(template_name, context)
+    strip_tags(html_content)
+
+class Command(BaseCommand):
+    help = 'Measure emails rendered per second with per-message HTML stripping and with the precompiled ' \
+           'HTML and plain-text templates'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('--iterations', type=int, default=5000)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        iterations = options['iterations']
+        self.stdout.write(f'{"template":<36} {"strip_tags/s":>13} {"precompiled/s":>14} {"speedup":>8}')
+        for template_name, context in SAMPLE_CONTEXTS.items():
+            context = {**context, 'site_name': settings.SITE_NAME}
+            before = self.rate(render_per_message, template_name, context, iterations)
+            after = self.rate(render_email, template_name, context, iterations)
+            self.stdout.write(f'{template_name.split("/")[-1]:<36} {before:>13.0f} {after:>14.0f} '
+                              f'{after / before:>7.1f}x')
+
+    def rate(self, render: Callable, template_name: str, context: Dict[str, Any], iterations: int) -> float:
+        render(template_name, context)
+        started = time.perf_counter()
+        for _ in range(iterations):
+            render(template_name, context)
+        return iterations / (time.perf_counter() - started)
@@ -0,0 +1,40 @@
+import os
+import time
+import tracemalloc
+from typing import Any
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core_apps.accounts.management.seed import seed_transaction_history
+from core_apps.accounts.queries import transaction_history
+from core_apps.accounts.statements import STATEMENT_ROWS_PER_PAGE, render_statement_pdf, statement_rows
+
+class Command(BaseCommand):
+    help = 'Render transaction history PDF statements of several sizes and report time, peak memory and file size'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 50000, 500000])
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        with transaction.atomic():
+            accounts, _ = seed_transaction_history(users=2, transactions_per_user=max(options['sizes']))
+            user = accounts[0].user
+            queryset = transaction_history(user).order_by('-created_at')
+
+            self.stdout.write(f'{"rows":>8} {"pages":>7} {"seconds":>9} {"peak MB":>9} {"file MB":>9}')
+            for size in options['sizes']:
+                tracemalloc.start()
+                started = time.perf_counter()
+                pdf_path = render_statement_pdf(f'Benchmark statement ({size} rows)',
+                                                statement_rows(queryset[:size]))
+                elapsed = time.perf_counter() - started
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                file_size = os.path.getsize(pdf_path)
+                os.remove(pdf_path)
+                pages = -(-size // STATEMENT_ROWS_PER_PAGE)
+                self.stdout.write(f'{size:>8} {pages:>7} {elapsed:>9.2f} {peak / 2 ** 20:>9.1f} '
+                                  f'{file_size / 2 ** 20:>9.1f}')
+            transaction.set_rollback(True)
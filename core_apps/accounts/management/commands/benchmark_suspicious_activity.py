@@ -0,0 +1,38 @@
+import time
+from datetime import timedelta
+from decimal import Decimal
+from typing import Any
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from core_apps.accounts.fraud import detect_suspicious
+from core_apps.accounts.management.seed import seed_transaction_history
+
+class Command(BaseCommand):
+    help = 'Time the suspicious activity rules against seeded histories of increasing account counts'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+        parser.add_argument('--transactions-per-account', type=int, default=2)
+        parser.add_argument('--time-window-hours', type=int, default=24)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        time_window = timedelta(hours=options['time_window_hours'])
+        with transaction.atomic():
+            self.stdout.write(f'{"accounts":>9} {"transactions":>13} {"seconds":>9} {"queries":>8} {"alerts":>8}')
+            seeded_accounts, seeded_transactions = 0, 0
+            for size in sorted(options['sizes']):
+                _, created = seed_transaction_history(users=size - seeded_accounts,
+                                                      transactions_per_user=options['transactions_per_account'],
+                                                      days=2 * time_window.days or 1)
+                seeded_accounts, seeded_transactions = size, seeded_transactions + created
+
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    alerts = detect_suspicious(Decimal('990'), 3, time_window)
+                    elapsed = time.perf_counter() - started
+                self.stdout.write(f'{size:>9} {seeded_transactions:>13} {elapsed:>9.2f} {len(queries):>8} '
+                                  f'{len(alerts):>8}')
+            transaction.set_rollback(True)
@@ -0,0 +1,43 @@
+import time
+from typing import Any, Callable, Tuple
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from core_apps.accounts.feeds import project_transactions, transaction_feed
+from core_apps.accounts.management.seed import seed_transaction_history
+from core_apps.accounts.queries import transaction_history
+from core_apps.accounts.serializers import TransactionSerializer
+
+class Command(BaseCommand):
+    help = 'Compare TransactionSerializer with the projected transaction feed at several page sizes'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000])
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        with transaction.atomic():
+            accounts, _ = seed_transaction_history(users=50, transactions_per_user=max(options['sizes']))
+            user = accounts[0].user
+            queryset = transaction_history(user).order_by('-created_at', '-id')
+
+            self.stdout.write(f'{"rows":>6} {"serializer ms":>14} {"queries":>8} {"feed ms":>9} {"queries":>8}')
+            for size in options['sizes']:
+                serializer_ms, serializer_queries = self.measure(
+                    lambda: TransactionSerializer(list(queryset[:size]), many=True).data, options['repeat'])
+                feed_ms, feed_queries = self.measure(
+                    lambda: transaction_feed(project_transactions(queryset)[:size]), options['repeat'])
+                self.stdout.write(f'{size:>6} {serializer_ms:>14.2f} {serializer_queries:>8} {feed_ms:>9.2f} '
+                                  f'{feed_queries:>8}')
+            transaction.set_rollback(True)
+
+    def measure(self, render: Callable, repeat: int) -> Tuple[float, int]:
+        timings = []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                render()
+                timings.append((time.perf_counter() - started) * 1000)
+        return min(timings), len(queries)
@@ -0,0 +1,97 @@
+import random
+import threading
+import time
+import uuid
+from decimal import Decimal
+from typing import Any
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+from django.db.models import Sum
+
+from core_apps.accounts.models import BankAccount, LedgerEntry, Transaction
+from core_apps.accounts.posting import InsufficientFundsError, post_transfer, retry_on_deadlock
+
+User = get_user_model()
+
+class Command(BaseCommand):
+    help = 'Run concurrent transfers between a pool of hot accounts and report throughput and retries'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('--accounts', type=int, default=10)
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--transfers', type=int, default=2000)
+        parser.add_argument('--opening-balance', type=Decimal, default=Decimal('100000.00'))
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        run_id = uuid.uuid4().hex[:6]
+        accounts = self.seed_accounts(run_id, options['accounts'], options['opening_balance'])
+        account_ids = [account.id for account in accounts]
+        opening_total = options['opening_balance'] * len(accounts)
+
+        stats = {'completed': 0, 'retries': 0, 'insufficient': 0, 'failed': 0}
+        stats_lock = threading.Lock()
+
+        def count(key: str) -> None:
+            with stats_lock:
+                stats[key] += 1
+
+        transfer = retry_on_deadlock(post_transfer, on_retry=lambda e: count('retries'))
+        per_thread = options['transfers'] // options['threads']
+
+        def worker() -> None:
+            try:
+                for _ in range(per_thread):
+                    sender_id, receiver_id = random.sample(account_ids, 2)
+                    try:
+                        transfer(sender_id, receiver_id, Decimal('1.00'), user=None,
+                                 description=f'Benchmark transfer {run_id}')
+                        count('completed')
+                    except InsufficientFundsError:
+                        count('insufficient')
+                    except OperationalError:
+                        count('failed')
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(options['threads'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        closing_total = BankAccount.objects.filter(id__in=account_ids).aggregate(
+            total=Sum('account_balance'))['total']
+        self.stdout.write(f'Accounts: {len(accounts)}, threads: {options["threads"]}, elapsed: {elapsed:.2f}s')
+        self.stdout.write(f'Transfers/sec: {stats["completed"] / elapsed:.1f}')
+        self.stdout.write(f'Completed: {stats["completed"]}, deadlock/serialization retries: {stats["retries"]}, '
+                          f'failed after retries: {stats["failed"]}, insufficient funds: {stats["insufficient"]}')
+        if closing_total == opening_total:
+            self.stdout.write(self.style.SUCCESS(f'Balances conserved: {closing_total}'))
+        else:
+            self.stdout.write(self.style.ERROR(f'Lost updates: opened with {opening_total}, closed with '
+                                               f'{closing_total}'))
+        self.cleanup(accounts)
+
+    def seed_accounts(self, run_id: str, count: int, opening_balance: Decimal) -> list:
+        accounts = []
+        id_base = random.randint(10 ** 8, 10 ** 9)
+        for i in range(count):
+            user = User.objects.create_user(
+                email=f'bench-{run_id}-{i}@example.com', password=uuid.uuid4().hex, first_name='Bench',
+                last_name=f'User {i}', id_no=id_base + i, security_question=User.SecurityQuestions.BIRTH_CITY,
+                security_answer='bench'
+            )
+            accounts.append(BankAccount.objects.create(
+                user=user, account_number=f'BENCH{run_id}{i:06d}', account_balance=opening_balance,
+                account_status=BankAccount.AccountStatus.ACTIVE, fully_activated=True, kyc_verified=True
+            ))
+        return accounts
+
+    def cleanup(self, accounts: list) -> None:
+        LedgerEntry.objects.filter(account__in=accounts).delete()
+        Transaction.objects.filter(sender_account__in=accounts).delete()
+        User.objects.filter(id__in=[account.user_id for account in accounts]).delete()
@@ -0,0 +1,67 @@
+import random
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from typing import List, Tuple
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.utils import timezone
+
+from core_apps.accounts.models import BankAccount, LedgerEntry, Transaction
+
+User = get_user_model()
+
+def seed_transaction_history(users: int, transactions_per_user: int, days: int = 730,
+                             batch_size: int = 5000) -> Tuple[List[BankAccount], int]:
+    """
+    Bulk insert users, one account each and a ring of transfers between them,
+    spread over the last ``days`` days, for benchmarks and plan checks. Call it
+    inside a transaction that is rolled back afterwards.
+    """
+    run_id = uuid.uuid4().hex[:6]
+    id_base = random.randint(10 ** 8, 10 ** 9)
+    seeded_users = User.objects.bulk_create([
+        User(email=f'seed-{run_id}-{i}@example.com', username=f'S{run_id}{i:05d}', first_name='Seed',
+             middle_name='Data' if i % 2 else None, last_name=f'User {i}', id_no=id_base + i,
+             security_question=User.SecurityQuestions.BIRTH_CITY, security_answer='seed')
+        for i in range(users)
+    ], batch_size=batch_size)
+    accounts = BankAccount.objects.bulk_create([
+        BankAccount(user=user, account_number=f'SEED{run_id}{i:07d}', ledger_sequence=transactions_per_user * 2,
+                    account_status=BankAccount.AccountStatus.ACTIVE)
+        for i, user in enumerate(seeded_users)
+    ], batch_size=batch_size)
+
+    created = 0
+    sequences = {account.id: 0 for account in accounts}
+    transactions, entries = [], []
+    for index, account in enumerate(accounts):
+        for offset in range(1, transactions_per_user + 1):
+            receiver_account = accounts[(index + offset) % len(accounts)]
+            transfer = Transaction(
+                user=account.user, sender=account.user, sender_account=account, receiver=receiver_account.user,
+                receiver_account=receiver_account, amount=Decimal(random.randint(100, 100000)) / 100,
+                description=f'Seeded transfer {offset}', transaction_type=Transaction.TransactionType.TRANSFER,
+                transaction_status=Transaction.TransactionStatus.SUCCESS
+            )
+            transactions.append(transfer)
+            for side, amount in ((account, -transfer.amount), (receiver_account, transfer.amount)):
+                sequences[side.id] += 1
+                entries.append(LedgerEntry(account=side, transaction=transfer, sequence=sequences[side.id],
+                                           amount=amount, balance_after=Decimal(0)))
+        if len(transactions) >= batch_size or index == len(accounts) - 1:
+            Transaction.objects.bulk_create(transactions)
+            LedgerEntry.objects.bulk_create(entries)
+            created += len(transactions)
+            transactions, entries = [], []
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {Transaction._meta.db_table} SET created_at = %s - (random() * %s) '
+            f'WHERE sender_account_id = ANY(%s)',
+            [timezone.now(), timedelta(days=days), [account.id for account in accounts]]
+        )
+        for model in (Transaction, LedgerEntry, BankAccount):
+            cursor.execute(f'ANALYZE {model._meta.db_table}')
+    return accounts, created
@@ -0,0 +1,159 @@
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Q
+import django.db.models.deletion
+import uuid
+
+
+def backfill_ledger(apps, schema_editor):
+    BankAccount = apps.get_model('accounts', 'BankAccount')
+    Transaction = apps.get_model('accounts', 'Transaction')
+    LedgerEntry = apps.get_model('accounts', 'LedgerEntry')
+    BalanceSnapshot = apps.get_model('accounts', 'BalanceSnapshot')
+
+    for account in BankAccount.objects.all().iterator(chunk_size=500):
+        history = Transaction.objects.filter(
+            Q(sender_account=account) | Q(receiver_account=account), transaction_status='SUCCESS'
+        ).order_by('created_at').values_list('id', 'amount', 'sender_account_id', 'created_at')
+        deltas = [
+            (transaction_id, -amount if sender_account_id == account.id else amount, created_at)
+            for transaction_id, amount, sender_account_id, created_at in history
+        ]
+        balance = account.account_balance - sum((delta for _, delta, _ in deltas), Decimal(0))
+        BalanceSnapshot.objects.create(account=account, sequence=0, balance=balance)
+
+        entries = []
+        for sequence, (transaction_id, delta, created_at) in enumerate(deltas, start=1):
+            balance += delta
+            entries.append(LedgerEntry(account=account, transaction_id=transaction_id, sequence=sequence,
+                                       amount=delta, balance_after=balance))
+        LedgerEntry.objects.bulk_create(entries, batch_size=1000)
+        BankAccount.objects.filter(pk=account.pk).update(ledger_sequence=len(entries))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_bankaccount_interest_rate_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="bankaccount",
+            name="ledger_sequence",
+            field=models.PositiveBigIntegerField(
+                default=0,
+                editable=False,
+                help_text="Sequence number of the last ledger entry posted to this account",
+                verbose_name="Ledger Sequence",
+            ),
+        ),
+        migrations.CreateModel(
+            name="LedgerEntry",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("sequence", models.PositiveBigIntegerField(verbose_name="Sequence")),
+                (
+                    "amount",
+                    models.DecimalField(
+                        decimal_places=2,
+                        help_text="Signed amount, positive for credits and negative for debits",
+                        max_digits=12,
+                        verbose_name="Amount",
+                    ),
+                ),
+                (
+                    "balance_after",
+                    models.DecimalField(
+                        decimal_places=2, max_digits=12, verbose_name="Balance After"
+                    ),
+                ),
+                (
+                    "account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="ledger_entries",
+                        to="accounts.bankaccount",
+                    ),
+                ),
+                (
+                    "transaction",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="ledger_entries",
+                        to="accounts.transaction",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Ledger Entry",
+                "verbose_name_plural": "Ledger Entries",
+                "ordering": ("account", "sequence"),
+            },
+        ),
+        migrations.CreateModel(
+            name="BalanceSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "sequence",
+                    models.PositiveBigIntegerField(
+                        help_text="Sequence of the last ledger entry included in the balance",
+                        verbose_name="Sequence",
+                    ),
+                ),
+                (
+                    "balance",
+                    models.DecimalField(
+                        decimal_places=2, max_digits=12, verbose_name="Balance"
+                    ),
+                ),
+                (
+                    "account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="balance_snapshots",
+                        to="accounts.bankaccount",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Balance Snapshot",
+                "verbose_name_plural": "Balance Snapshots",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="ledgerentry",
+            constraint=models.UniqueConstraint(
+                fields=("account", "sequence"), name="unique_ledger_entry_sequence"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="balancesnapshot",
+            constraint=models.UniqueConstraint(
+                fields=("account", "sequence"), name="unique_balance_snapshot_sequence"
+            ),
+        ),
+        migrations.RunPython(backfill_ledger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0004_transaction_composite_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StatementArtifact",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "period",
+                    models.DateField(
+                        help_text="First day of the statement month",
+                        verbose_name="Period",
+                    ),
+                ),
+                (
+                    "ledger_sequence",
+                    models.PositiveBigIntegerField(
+                        help_text="Sequence of the last ledger entry posted to the account by the period end",
+                        verbose_name="Ledger Sequence",
+                    ),
+                ),
+                (
+                    "file",
+                    models.FileField(
+                        upload_to="statements/%Y/%m/", verbose_name="File"
+                    ),
+                ),
+                (
+                    "account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="statements",
+                        to="accounts.bankaccount",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Statement Artifact",
+                "verbose_name_plural": "Statement Artifacts",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="statementartifact",
+            constraint=models.UniqueConstraint(
+                fields=("account", "period", "ledger_sequence"),
+                name="unique_statement_artifact",
+            ),
+        ),
+    ]
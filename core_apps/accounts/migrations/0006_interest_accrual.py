@@ -0,0 +1,127 @@
+from decimal import Decimal
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+def seed_interest_tiers(apps, schema_editor):
+    InterestTier = apps.get_model('accounts', 'InterestTier')
+    InterestTier.objects.bulk_create([
+        InterestTier(minimum_balance=Decimal('0.00'), annual_rate=Decimal('0.0050')),
+        InterestTier(minimum_balance=Decimal('100000.00'), annual_rate=Decimal('0.0100')),
+        InterestTier(minimum_balance=Decimal('500000.00'), annual_rate=Decimal('0.0150')),
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0005_statementartifact"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InterestTier",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "minimum_balance",
+                    models.DecimalField(
+                        decimal_places=2,
+                        help_text="Lowest balance the rate applies to",
+                        max_digits=12,
+                        unique=True,
+                        verbose_name="Minimum Balance",
+                    ),
+                ),
+                (
+                    "annual_rate",
+                    models.DecimalField(
+                        decimal_places=4,
+                        help_text="Annual interest rate as a decimal (eg. 0.0150 for 1.50%)",
+                        max_digits=5,
+                        verbose_name="Annual Rate",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Interest Tier",
+                "verbose_name_plural": "Interest Tiers",
+                "ordering": ("minimum_balance",),
+            },
+        ),
+        migrations.CreateModel(
+            name="InterestAccrual",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("accrual_date", models.DateField(verbose_name="Accrual Date")),
+                (
+                    "balance",
+                    models.DecimalField(
+                        decimal_places=2, max_digits=12, verbose_name="Balance"
+                    ),
+                ),
+                (
+                    "annual_rate",
+                    models.DecimalField(
+                        decimal_places=4, max_digits=5, verbose_name="Annual Rate"
+                    ),
+                ),
+                (
+                    "amount",
+                    models.DecimalField(
+                        decimal_places=6,
+                        help_text="Unrounded interest accrued for the day",
+                        max_digits=16,
+                        verbose_name="Amount",
+                    ),
+                ),
+                (
+                    "capitalized_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Capitalized At"
+                    ),
+                ),
+                (
+                    "account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="interest_accruals",
+                        to="accounts.bankaccount",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Interest Accrual",
+                "verbose_name_plural": "Interest Accruals",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="interestaccrual",
+            constraint=models.UniqueConstraint(
+                fields=("account", "accrual_date"), name="unique_interest_accrual_date"
+            ),
+        ),
+        migrations.RunPython(seed_interest_tiers, migrations.RunPython.noop),
+    ]
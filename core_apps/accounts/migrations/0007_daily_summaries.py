@@ -0,0 +1,139 @@
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0006_interest_accrual"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AccountDailySummary",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("date", models.DateField(verbose_name="Date")),
+                (
+                    "transaction_type",
+                    models.CharField(
+                        choices=[
+                            ("DEPOSIT", "Deposit"),
+                            ("WITHDRAW", "Withdraw"),
+                            ("TRANSFER", "Transfer"),
+                            ("INTEREST", "Interest"),
+                        ],
+                        max_length=10,
+                        verbose_name="Transaction Type",
+                    ),
+                ),
+                (
+                    "credit_count",
+                    models.PositiveIntegerField(default=0, verbose_name="Credit Count"),
+                ),
+                (
+                    "credit_amount",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=14,
+                        verbose_name="Credit Amount",
+                    ),
+                ),
+                (
+                    "debit_count",
+                    models.PositiveIntegerField(default=0, verbose_name="Debit Count"),
+                ),
+                (
+                    "debit_amount",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=14,
+                        verbose_name="Debit Amount",
+                    ),
+                ),
+                (
+                    "closing_balance",
+                    models.DecimalField(
+                        decimal_places=2,
+                        help_text="Balance after the last ledger entry rolled up into this row",
+                        max_digits=12,
+                        verbose_name="Closing Balance",
+                    ),
+                ),
+                (
+                    "last_sequence",
+                    models.PositiveBigIntegerField(
+                        help_text="Sequence of the last ledger entry rolled up into this row",
+                        verbose_name="Last Sequence",
+                    ),
+                ),
+                (
+                    "account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_summaries",
+                        to="accounts.bankaccount",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Account Daily Summary",
+                "verbose_name_plural": "Account Daily Summaries",
+            },
+        ),
+        migrations.CreateModel(
+            name="DailySummaryWatermark",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "sequence",
+                    models.PositiveBigIntegerField(
+                        help_text="Sequence of the last ledger entry rolled up for the account",
+                        verbose_name="Sequence",
+                    ),
+                ),
+                (
+                    "account",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_summary_watermark",
+                        to="accounts.bankaccount",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Daily Summary Watermark",
+                "verbose_name_plural": "Daily Summary Watermarks",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="accountdailysummary",
+            constraint=models.UniqueConstraint(
+                fields=("account", "date", "transaction_type"),
+                name="unique_account_daily_summary",
+            ),
+        ),
+    ]
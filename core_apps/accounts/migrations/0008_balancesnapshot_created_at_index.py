@@ -0,0 +1,20 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("accounts", "0007_daily_summaries"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="balancesnapshot",
+            index=models.Index(
+                fields=["account", "created_at"], name="accounts_ba_account_6a4a6d_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0008_balancesnapshot_created_at_index"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="interestaccrual",
+            name="unique_interest_accrual_date",
+        ),
+        migrations.AddField(
+            model_name="interestaccrual",
+            name="residual",
+            field=models.BooleanField(
+                default=False,
+                help_text="Sub-cent interest carried over from the previous capitalization",
+                verbose_name="Residual",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="interestaccrual",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("residual", False)),
+                fields=("account", "accrual_date"),
+                name="unique_interest_accrual_date",
+            ),
+        ),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0009_interestaccrual_residual"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ConsumedIntent",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "intent_id",
+                    models.CharField(max_length=32, unique=True, verbose_name="Intent ID"),
+                ),
+                ("kind", models.CharField(max_length=20, verbose_name="Kind")),
+                (
+                    "expires_at",
+                    models.DateTimeField(
+                        db_index=True,
+                        help_text="When the intent token expires and this mark can be purged",
+                        verbose_name="Expires At",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Consumed Intent",
+                "verbose_name_plural": "Consumed Intents",
+            },
+        ),
+    ]
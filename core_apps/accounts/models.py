@@ -3,7 +3,7 @@ from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils.translation import gettext_lazy as _
-from decimal import Decimal, ROUND_HALF_UP
+from decimal import Decimal
 from loguru import logger
 
 from core_apps.common.models import TimeStampedModel
@@ -44,6 +44,8 @@ class BankAccount(TimeStampedModel):
     fully_activated = models.BooleanField(_('Fully Activated'), default=False)
     interest_rate = models.DecimalField(_('Interest Rate'), max_digits=5, decimal_places=4, default=0.00, 
                                         help_text='Annual interest rate as a decimal (eg. 0.0150 for 1.50%)')
+    ledger_sequence = models.PositiveBigIntegerField(_('Ledger Sequence'), default=0, editable=False,
+                                        help_text='Sequence number of the last ledger entry posted to this account')
 
     def __str__(self) -> str:
         return f'{self.user.full_name}\'s {self.get_account_currency_display()} - {self.get_account_type_display()} ' + \
@@ -53,31 +55,17 @@ class BankAccount(TimeStampedModel):
     def annual_interest_rate(self):
         if self.account_type != BankAccount.BankAccountType.SAVING:
             return Decimal(0)
-        balance = Decimal(self.account_balance)
-        if balance < Decimal(100000):
-            return Decimal(0.0050)
-        elif Decimal(100000) <= balance < Decimal(500000):
-            return Decimal(0.0100)
-        else:
-            return Decimal(0.0150)
+        from .interest import tiered_annual_rate
+
+        return tiered_annual_rate(Decimal(self.account_balance))
         
     def apply_daily_interest(self) -> Decimal:
         if self.account_type == BankAccount.BankAccountType.SAVING:
-            daily_rate = self.annual_interest_rate / Decimal(365)
-            interest = (daily_rate * Decimal(self.account_balance)).quantize(Decimal('.01'), rounding=ROUND_HALF_UP)
-            logger.info(f'Applying daily interest {interest} to account {self.account_type}')
-            self.account_balance += interest
-            self.save()
-
-            Transaction.objects.create(
-                user=self.user,
-                amount=interest,
-                transaction_type=Transaction.TransactionType.INTEREST,
-                description=f'Daily interest applied for account {self.account_number}',
-                receiver=self.user,
-                receiver_account=self,
-                transaction_status=Transaction.TransactionStatus.SUCCESS,
-            )
+            from django.utils import timezone
+            from .interest import accrue_account_interest
+
+            interest = accrue_account_interest(self, timezone.now().date())
+            logger.info(f'Accrued daily interest {interest} to account {self.account_number}')
             return interest
         return Decimal(0.00)
 
@@ -130,5 +118,160 @@ class Transaction(TimeStampedModel):
         verbose_name_plural = _('Transactions')
         indexes = [
             models.Index(fields=['created_at']),
+            models.Index(fields=['sender_account', 'created_at']),
+            models.Index(fields=['receiver_account', 'created_at']),
+            models.Index(fields=['user', 'created_at']),
+            models.Index(fields=['sender', 'created_at']),
+            models.Index(fields=['receiver', 'created_at']),
         ]
-        
\ No newline at end of file
+        
+
+class LedgerEntry(TimeStampedModel):
+    account = models.ForeignKey(BankAccount, on_delete=models.PROTECT, related_name='ledger_entries')
+    transaction = models.ForeignKey(Transaction, on_delete=models.PROTECT, related_name='ledger_entries')
+    sequence = models.PositiveBigIntegerField(_('Sequence'))
+    amount = models.DecimalField(_('Amount'), max_digits=12, decimal_places=2,
+                                 help_text='Signed amount, positive for credits and negative for debits')
+    balance_after = models.DecimalField(_('Balance After'), max_digits=12, decimal_places=2)
+
+    def __str__(self) -> str:
+        return f'{self.account.account_number} #{self.sequence} - {self.amount}'
+
+    class Meta:
+        ordering = ('account', 'sequence')
+        verbose_name = _('Ledger Entry')
+        verbose_name_plural = _('Ledger Entries')
+        constraints = [
+            models.UniqueConstraint(fields=['account', 'sequence'], name='unique_ledger_entry_sequence'),
+        ]
+
+
+class BalanceSnapshot(TimeStampedModel):
+    account = models.ForeignKey(BankAccount, on_delete=models.CASCADE, related_name='balance_snapshots')
+    sequence = models.PositiveBigIntegerField(_('Sequence'),
+                                              help_text='Sequence of the last ledger entry included in the balance')
+    balance = models.DecimalField(_('Balance'), max_digits=12, decimal_places=2)
+
+    def __str__(self) -> str:
+        return f'{self.account.account_number} @ #{self.sequence} - {self.balance}'
+
+    class Meta:
+        verbose_name = _('Balance Snapshot')
+        verbose_name_plural = _('Balance Snapshots')
+        constraints = [
+            models.UniqueConstraint(fields=['account', 'sequence'], name='unique_balance_snapshot_sequence'),
+        ]
+        indexes = [
+            models.Index(fields=['account', 'created_at']),
+        ]
+
+
+class StatementArtifact(TimeStampedModel):
+    account = models.ForeignKey(BankAccount, on_delete=models.CASCADE, related_name='statements')
+    period = models.DateField(_('Period'), help_text='First day of the statement month')
+    ledger_sequence = models.PositiveBigIntegerField(
+        _('Ledger Sequence'), help_text='Sequence of the last ledger entry posted to the account by the period end'
+    )
+    file = models.FileField(_('File'), upload_to='statements/%Y/%m/')
+
+    def __str__(self) -> str:
+        return f'{self.account.account_number} - {self.period:%Y-%m} @ #{self.ledger_sequence}'
+
+    class Meta:
+        verbose_name = _('Statement Artifact')
+        verbose_name_plural = _('Statement Artifacts')
+        constraints = [
+            models.UniqueConstraint(fields=['account', 'period', 'ledger_sequence'],
+                                    name='unique_statement_artifact'),
+        ]
+
+
+class InterestTier(TimeStampedModel):
+    minimum_balance = models.DecimalField(_('Minimum Balance'), max_digits=12, decimal_places=2, unique=True,
+                                          help_text='Lowest balance the rate applies to')
+    annual_rate = models.DecimalField(_('Annual Rate'), max_digits=5, decimal_places=4,
+                                      help_text='Annual interest rate as a decimal (eg. 0.0150 for 1.50%)')
+
+    def __str__(self) -> str:
+        return f'From {self.minimum_balance} - {self.annual_rate}'
+
+    class Meta:
+        ordering = ('minimum_balance',)
+        verbose_name = _('Interest Tier')
+        verbose_name_plural = _('Interest Tiers')
+
+
+class InterestAccrual(TimeStampedModel):
+    account = models.ForeignKey(BankAccount, on_delete=models.CASCADE, related_name='interest_accruals')
+    accrual_date = models.DateField(_('Accrual Date'))
+    balance = models.DecimalField(_('Balance'), max_digits=12, decimal_places=2)
+    annual_rate = models.DecimalField(_('Annual Rate'), max_digits=5, decimal_places=4)
+    amount = models.DecimalField(_('Amount'), max_digits=16, decimal_places=6,
+                                 help_text='Unrounded interest accrued for the day')
+    capitalized_at = models.DateTimeField(_('Capitalized At'), null=True, blank=True)
+    residual = models.BooleanField(_('Residual'), default=False,
+                                   help_text='Sub-cent interest carried over from the previous capitalization')
+
+    def __str__(self) -> str:
+        return f'{self.account.account_number} - {self.accrual_date} - {self.amount}'
+
+    class Meta:
+        verbose_name = _('Interest Accrual')
+        verbose_name_plural = _('Interest Accruals')
+        constraints = [
+            models.UniqueConstraint(fields=['account', 'accrual_date'], condition=models.Q(residual=False),
+                                    name='unique_interest_accrual_date'),
+        ]
+
+
+class AccountDailySummary(TimeStampedModel):
+    account = models.ForeignKey(BankAccount, on_delete=models.CASCADE, related_name='daily_summaries')
+    date = models.DateField(_('Date'))
+    transaction_type = models.CharField(_('Transaction Type'), max_length=10,
+                                        choices=Transaction.TransactionType.choices)
+    credit_count = models.PositiveIntegerField(_('Credit Count'), default=0)
+    credit_amount = models.DecimalField(_('Credit Amount'), max_digits=14, decimal_places=2, default=0)
+    debit_count = models.PositiveIntegerField(_('Debit Count'), default=0)
+    debit_amount = models.DecimalField(_('Debit Amount'), max_digits=14, decimal_places=2, default=0)
+    closing_balance = models.DecimalField(_('Closing Balance'), max_digits=12, decimal_places=2,
+                                          help_text='Balance after the last ledger entry rolled up into this row')
+    last_sequence = models.PositiveBigIntegerField(_('Last Sequence'),
+                                                   help_text='Sequence of the last ledger entry rolled up into this row')
+
+    def __str__(self) -> str:
+        return f'{self.account.account_number} - {self.date} - {self.transaction_type}'
+
+    class Meta:
+        verbose_name = _('Account Daily Summary')
+        verbose_name_plural = _('Account Daily Summaries')
+        constraints = [
+            models.UniqueConstraint(fields=['account', 'date', 'transaction_type'],
+                                    name='unique_account_daily_summary'),
+        ]
+
+
+class DailySummaryWatermark(TimeStampedModel):
+    account = models.OneToOneField(BankAccount, on_delete=models.CASCADE, related_name='daily_summary_watermark')
+    sequence = models.PositiveBigIntegerField(_('Sequence'),
+                                              help_text='Sequence of the last ledger entry rolled up for the account')
+
+    def __str__(self) -> str:
+        return f'{self.account.account_number} @ #{self.sequence}'
+
+    class Meta:
+        verbose_name = _('Daily Summary Watermark')
+        verbose_name_plural = _('Daily Summary Watermarks')
+
+
+class ConsumedIntent(TimeStampedModel):
+    intent_id = models.CharField(_('Intent ID'), max_length=32, unique=True)
+    kind = models.CharField(_('Kind'), max_length=20)
+    expires_at = models.DateTimeField(_('Expires At'), db_index=True,
+                                      help_text='When the intent token expires and this mark can be purged')
+
+    def __str__(self) -> str:
+        return f'{self.kind} - {self.intent_id}'
+
+    class Meta:
+        verbose_name = _('Consumed Intent')
+        verbose_name_plural = _('Consumed Intents')
@@ -0,0 +1,260 @@
+import time
+from decimal import Decimal
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from django.db import OperationalError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from loguru import logger
+
+from .models import BankAccount, LedgerEntry, Transaction
+from .velocity import check_velocity
+
+DEADLOCK_DETECTED = '40P01'
+SERIALIZATION_FAILURE = '40001'
+
+class InsufficientFundsError(Exception):
+    pass
+
+def lock_accounts(account_ids: Iterable[UUID]) -> Dict[UUID, BankAccount]:
+    """
+    Lock the given bank accounts with ``SELECT ... FOR UPDATE`` in ascending id
+    order, so two postings touching the same accounts always queue instead of
+    deadlocking. Must be called inside ``transaction.atomic``.
+    """
+    ids = sorted(set(account_ids), key=str)
+    accounts = BankAccount.objects.select_for_update().select_related('user').filter(id__in=ids).order_by('id')
+    locked = {account.id: account for account in accounts}
+    if len(locked) != len(ids):
+        raise BankAccount.DoesNotExist(_('Invalid account number'))
+    return locked
+
+def credit_account(account: BankAccount, amount: Decimal) -> LedgerEntry:
+    BankAccount.objects.filter(pk=account.pk).update(
+        account_balance=F('account_balance') + amount, ledger_sequence=F('ledger_sequence') + 1,
+        updated_at=timezone.now()
+    )
+    account.account_balance += amount
+    account.ledger_sequence += 1
+    return LedgerEntry(account=account, sequence=account.ledger_sequence, amount=amount,
+                       balance_after=account.account_balance)
+
+def debit_account(account: BankAccount, amount: Decimal) -> LedgerEntry:
+    updated = BankAccount.objects.filter(pk=account.pk, account_balance__gte=amount).update(
+        account_balance=F('account_balance') - amount, ledger_sequence=F('ledger_sequence') + 1,
+        updated_at=timezone.now()
+    )
+    if not updated:
+        raise InsufficientFundsError(_('Insufficient funds'))
+    account.account_balance -= amount
+    account.ledger_sequence += 1
+    return LedgerEntry(account=account, sequence=account.ledger_sequence, amount=-amount,
+                       balance_after=account.account_balance)
+
+def track_velocity(transactions: List[Transaction]) -> None:
+    transaction.on_commit(lambda: check_velocity(transactions))
+
+def record_entries(transaction: Transaction, entries: List[LedgerEntry]) -> Transaction:
+    for entry in entries:
+        entry.transaction = transaction
+    LedgerEntry.objects.bulk_create(entries)
+    track_velocity([transaction])
+    return transaction
+
+def retry_on_deadlock(func: Callable = None, *, max_retries: int = 3,
+                      on_retry: Optional[Callable[[OperationalError], None]] = None) -> Callable:
+    """
+    Run ``func`` in its own atomic block and retry it when Postgres aborts the
+    transaction with a deadlock or serialization failure.
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            for attempt in range(max_retries + 1):
+                try:
+                    with transaction.atomic():
+                        return func(*args, **kwargs)
+                except OperationalError as e:
+                    pgcode = getattr(e.__cause__, 'pgcode', None)
+                    if pgcode not in (DEADLOCK_DETECTED, SERIALIZATION_FAILURE) or attempt == max_retries:
+                        raise
+                    logger.warning(f'Retrying {func.__name__} after {pgcode}, attempt {attempt + 1}')
+                    if on_retry:
+                        on_retry(e)
+                    time.sleep(0.01 * 2 ** attempt)
+        return wrapper
+    return decorator(func) if func else decorator
+
+def post_deposit(account_id: UUID, amount: Decimal, *, description: str) -> Transaction:
+    account = lock_accounts([account_id])[account_id]
+    entry = credit_account(account, amount)
+    return record_entries(Transaction.objects.create(
+        user=account.user,
+        receiver=account.user,
+        receiver_account=account,
+        amount=amount,
+        description=description,
+        transaction_type=Transaction.TransactionType.DEPOSIT,
+        transaction_status=Transaction.TransactionStatus.SUCCESS
+    ), [entry])
+
+def post_withdrawal(account_id: UUID, amount: Decimal, *, user: Any, description: str) -> Transaction:
+    account = lock_accounts([account_id])[account_id]
+    entry = debit_account(account, amount)
+    return record_entries(Transaction.objects.create(
+        user=user,
+        sender=user,
+        sender_account=account,
+        amount=amount,
+        description=description,
+        transaction_type=Transaction.TransactionType.WITHDRAW,
+        transaction_status=Transaction.TransactionStatus.SUCCESS
+    ), [entry])
+
+def post_transfer(sender_account_id: UUID, receiver_account_id: UUID, amount: Decimal, *, user: Any,
+                  description: str) -> Transaction:
+    accounts = lock_accounts([sender_account_id, receiver_account_id])
+    sender_account = accounts[sender_account_id]
+    receiver_account = accounts[receiver_account_id]
+    entries = [debit_account(sender_account, amount), credit_account(receiver_account, amount)]
+    return record_entries(Transaction.objects.create(
+        user=user,
+        sender=user,
+        sender_account=sender_account,
+        receiver=receiver_account.user,
+        receiver_account=receiver_account,
+        amount=amount,
+        description=description,
+        transaction_type=Transaction.TransactionType.TRANSFER,
+        transaction_status=Transaction.TransactionStatus.SUCCESS
+    ), entries)
+
+def post_card_topup(virtual_card: Any, amount: Decimal, *, user: Any, description: str) -> Transaction:
+    account = lock_accounts([virtual_card.account_id])[virtual_card.account_id]
+    entry = debit_account(account, amount)
+    type(virtual_card).objects.filter(pk=virtual_card.pk).update(
+        balance=F('balance') + amount, updated_at=timezone.now()
+    )
+    virtual_card.balance += amount
+    virtual_card.account = account
+    return record_entries(Transaction.objects.create(
+        user=user,
+        amount=amount,
+        description=description,
+        transaction_type=Transaction.TransactionType.DEPOSIT,
+        transaction_status=Transaction.TransactionStatus.SUCCESS,
+        sender=user,
+        receiver=user,
+        sender_account=account,
+        receiver_account=account
+    ), [entry])
+
+def post_transfer_batch(sender_account_id: UUID, items: List[dict], *, user: Any) -> List[dict]:
+    """
+    Post many transfers from one sender in a single transaction. Receivers are
+    resolved with one query, every involved account is locked once, and the
+    balances, transactions and ledger entries are each written in bulk. Items
+    that cannot be posted are reported as failed without aborting the batch.
+    """
+    receiver_numbers = {item['receiver_account'] for item in items}
+    receiver_ids = BankAccount.objects.filter(account_number__in=receiver_numbers).values_list(
+        'account_number', 'id')
+    receiver_ids = dict(receiver_ids)
+    accounts = lock_accounts([sender_account_id, *receiver_ids.values()])
+    sender_account = accounts[sender_account_id]
+
+    results = []
+    transactions = []
+    entries = []
+    touched = {}
+    for index, item in enumerate(items):
+        amount = item['amount']
+        receiver_account = accounts.get(receiver_ids.get(item['receiver_account']))
+        result = {'index': index, 'receiver_account': item['receiver_account'], 'amount': str(amount)}
+        if receiver_account is None:
+            error = _('Invalid account number')
+        elif receiver_account.id == sender_account.id:
+            error = _('Sender and receiver accounts cannot be the same')
+        elif receiver_account.account_currency != sender_account.account_currency:
+            error = _('Sender and receiver accounts must have the same currency')
+        elif sender_account.account_balance < amount:
+            error = _('Insufficient funds for transfer')
+        else:
+            error = None
+        if error:
+            results.append({**result, 'status': Transaction.TransactionStatus.FAILED, 'error': str(error)})
+            continue
+
+        transfer = Transaction(
+            user=user,
+            sender=user,
+            sender_account=sender_account,
+            receiver=receiver_account.user,
+            receiver_account=receiver_account,
+            amount=amount,
+            description=item.get('description', ''),
+            transaction_type=Transaction.TransactionType.TRANSFER,
+            transaction_status=Transaction.TransactionStatus.SUCCESS
+        )
+        transactions.append(transfer)
+        for account, delta in ((sender_account, -amount), (receiver_account, amount)):
+            account.account_balance += delta
+            account.ledger_sequence += 1
+            entries.append(LedgerEntry(account=account, transaction=transfer, sequence=account.ledger_sequence,
+                                       amount=delta, balance_after=account.account_balance))
+            touched[account.id] = account
+        results.append({**result, 'status': Transaction.TransactionStatus.SUCCESS,
+                        'transaction_id': str(transfer.id)})
+
+    if transactions:
+        now = timezone.now()
+        for account in touched.values():
+            account.updated_at = now
+        BankAccount.objects.bulk_update(touched.values(), ['account_balance', 'ledger_sequence', 'updated_at'])
+        Transaction.objects.bulk_create(transactions)
+        LedgerEntry.objects.bulk_create(entries)
+        track_velocity(transactions)
+    return results
+
+def post_interest_batch(account_ids: Iterable[UUID], interest_for: Callable[[BankAccount], Decimal], *,
+                        description: str) -> Tuple[int, Decimal]:
+    """
+    Credit interest to many accounts in a single transaction. The accounts are
+    locked with one query, ``interest_for`` prices each locked balance, and the
+    balances, transactions and ledger entries are each written in bulk.
+    Accounts whose interest rounds to zero are skipped. ``description`` may
+    reference ``{account_number}``. Returns the number of accounts credited and
+    the total interest.
+    """
+    accounts = BankAccount.objects.select_for_update().filter(id__in=account_ids).order_by('id')
+    now = timezone.now()
+    touched, transactions, entries = [], [], []
+    for account in accounts:
+        amount = interest_for(account)
+        if amount <= 0:
+            continue
+        account.account_balance += amount
+        account.ledger_sequence += 1
+        account.updated_at = now
+        interest = Transaction(
+            user_id=account.user_id,
+            amount=amount,
+            transaction_type=Transaction.TransactionType.INTEREST,
+            description=description.format(account_number=account.account_number),
+            receiver_id=account.user_id,
+            receiver_account=account,
+            transaction_status=Transaction.TransactionStatus.SUCCESS,
+        )
+        transactions.append(interest)
+        entries.append(LedgerEntry(account=account, transaction=interest, sequence=account.ledger_sequence,
+                                   amount=amount, balance_after=account.account_balance))
+        touched.append(account)
+
+    if touched:
+        BankAccount.objects.bulk_update(touched, ['account_balance', 'ledger_sequence', 'updated_at'])
+        Transaction.objects.bulk_create(transactions)
+        LedgerEntry.objects.bulk_create(entries)
+    return len(touched), sum((interest.amount for interest in transactions), Decimal(0))
@@ -0,0 +1,32 @@
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from .models import BankAccount, Transaction
+
+def transaction_history(user, account: Optional[BankAccount] = None, created_from: Optional[datetime] = None,
+                        created_until: Optional[datetime] = None) -> QuerySet:
+    if account is not None:
+        queryset = Transaction.objects.filter(ledger_entries__account=account)
+    else:
+        queryset = Transaction.objects.filter(Q(sender=user) | Q(receiver=user))
+    if created_from:
+        queryset = queryset.filter(created_at__gte=created_from)
+    if created_until:
+        queryset = queryset.filter(created_at__lte=created_until)
+    return queryset
+
+def day_bounds(start_date: date, end_date: date) -> tuple:
+    return (timezone.make_aware(datetime.combine(start_date, time.min)),
+            timezone.make_aware(datetime.combine(end_date, time.max)))
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+def next_month(period: date) -> date:
+    return (period.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+def period_bounds(period: date) -> tuple:
+    return day_bounds(period, next_month(period) - timedelta(days=1))
@@ -0,0 +1,138 @@
+from datetime import date
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+from typing import Any, Dict, Tuple
+from uuid import UUID
+
+from django.db import models, transaction
+from django.db.models import F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
+from django.utils import timezone
+
+from .models import AccountDailySummary, BankAccount, DailySummaryWatermark, LedgerEntry
+
+ROLLUP_CHUNK_SIZE = 500
+ROLLUP_FIELDS = ['credit_count', 'credit_amount', 'debit_count', 'debit_amount', 'closing_balance', 'last_sequence',
+                 'updated_at']
+
+def pending_rollup_accounts():
+    watermark = DailySummaryWatermark.objects.filter(account=OuterRef('pk')).values('sequence')[:1]
+    return BankAccount.objects.annotate(
+        rolled_up=Coalesce(Subquery(watermark), Value(0), output_field=models.BigIntegerField())
+    ).filter(ledger_sequence__gt=F('rolled_up')).order_by('id').values_list('id', 'rolled_up')
+
+@transaction.atomic
+def roll_up_accounts(watermarks: Dict[UUID, int]) -> int:
+    """
+    Fold the ledger entries posted after each account's watermark into its
+    ``AccountDailySummary`` rows and advance the watermarks. Ledger sequences
+    are assigned under the account lock, so every entry up to the highest one
+    read is already committed and the watermark never skips an entry.
+    """
+    entries = LedgerEntry.objects.filter(
+        reduce(or_, (Q(account_id=account_id, sequence__gt=sequence) for account_id, sequence in watermarks.items()))
+    ).order_by('account_id', 'sequence').values_list(
+        'account_id', 'sequence', 'amount', 'balance_after', 'transaction__created_at', 'transaction__transaction_type'
+    )
+
+    summaries, last_sequences, rolled_up = {}, {}, 0
+    for account_id, sequence, amount, balance_after, created_at, transaction_type in entries.iterator(chunk_size=2000):
+        key = (account_id, timezone.localdate(created_at), transaction_type)
+        summary = summaries.get(key)
+        if summary is None:
+            summary = summaries[key] = AccountDailySummary(account_id=account_id, date=key[1],
+                                                           transaction_type=transaction_type, credit_amount=Decimal(0),
+                                                           debit_amount=Decimal(0))
+        if amount >= 0:
+            summary.credit_count += 1
+            summary.credit_amount += amount
+        else:
+            summary.debit_count += 1
+            summary.debit_amount -= amount
+        summary.closing_balance = balance_after
+        summary.last_sequence = sequence
+        last_sequences[account_id] = sequence
+        rolled_up += 1
+    if not summaries:
+        return 0
+
+    now = timezone.now()
+    existing = AccountDailySummary.objects.select_for_update().filter(
+        account_id__in={account_id for account_id, _, _ in summaries},
+        date__in={day for _, day, _ in summaries},
+    )
+    updated = []
+    for row in existing:
+        fresh = summaries.pop((row.account_id, row.date, row.transaction_type), None)
+        if fresh is None:
+            continue
+        row.credit_count += fresh.credit_count
+        row.credit_amount += fresh.credit_amount
+        row.debit_count += fresh.debit_count
+        row.debit_amount += fresh.debit_amount
+        row.closing_balance = fresh.closing_balance
+        row.last_sequence = fresh.last_sequence
+        row.updated_at = now
+        updated.append(row)
+    AccountDailySummary.objects.bulk_update(updated, ROLLUP_FIELDS)
+    AccountDailySummary.objects.bulk_create(summaries.values())
+    DailySummaryWatermark.objects.bulk_create(
+        [DailySummaryWatermark(account_id=account_id, sequence=sequence)
+         for account_id, sequence in last_sequences.items()],
+        update_conflicts=True, unique_fields=['account'], update_fields=['sequence', 'updated_at']
+    )
+    return rolled_up
+
+def roll_up_daily_summaries(chunk_size: int = ROLLUP_CHUNK_SIZE) -> Tuple[int, int]:
+    """
+    Bring the daily summaries of every account with new ledger entries up to
+    date, ``chunk_size`` accounts per database transaction. Returns the number
+    of accounts and ledger entries rolled up.
+    """
+    accounts, entries = 0, 0
+    watermarks = {}
+    for account_id, rolled_up in pending_rollup_accounts().iterator(chunk_size=chunk_size):
+        watermarks[account_id] = rolled_up
+        if len(watermarks) == chunk_size:
+            entries += roll_up_accounts(watermarks)
+            accounts += len(watermarks)
+            watermarks = {}
+    if watermarks:
+        entries += roll_up_accounts(watermarks)
+        accounts += len(watermarks)
+    return accounts, entries
+
+def account_analytics(account: BankAccount, since: date) -> Dict[str, Any]:
+    """
+    Monthly income and spend per transaction type and the daily closing
+    balance curve of ``account`` from ``since``, read from the daily summaries
+    only.
+    """
+    summaries = AccountDailySummary.objects.filter(account=account, date__gte=since)
+    months = {}
+    monthly = summaries.annotate(month=TruncMonth('date')).values('month', 'transaction_type').annotate(
+        income=Sum('credit_amount'), spend=Sum('debit_amount')).order_by('month', 'transaction_type')
+    for row in monthly:
+        month = months.setdefault(row['month'], {
+            'month': row['month'].strftime('%Y-%m'), 'income': {}, 'spend': {},
+            'total_income': Decimal(0), 'total_spend': Decimal(0),
+        })
+        if row['income']:
+            month['income'][row['transaction_type']] = str(row['income'])
+            month['total_income'] += row['income']
+        if row['spend']:
+            month['spend'][row['transaction_type']] = str(row['spend'])
+            month['total_spend'] += row['spend']
+    for month in months.values():
+        month['total_income'], month['total_spend'] = str(month['total_income']), str(month['total_spend'])
+
+    balance_curve = summaries.order_by('date', '-last_sequence').distinct('date') \
+        .values_list('date', 'closing_balance')
+    return {
+        'account_number': account.account_number,
+        'account_currency': account.account_currency,
+        'months': list(months.values()),
+        'balance_curve': [{'date': day.isoformat(), 'closing_balance': str(balance)}
+                          for day, balance in balance_curve],
+    }
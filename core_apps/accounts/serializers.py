@@ -129,6 +129,23 @@ class TransactionSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(_('Invalid account number'))
         return attrs
     
+class BatchTransferItemSerializer(serializers.Serializer):
+    receiver_account = serializers.CharField(max_length=20)
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.1'))
+    description = serializers.CharField(required=False, allow_blank=True, default='')
+
+class BatchTransferSerializer(serializers.Serializer):
+    MAX_ITEMS = 500
+
+    sender_account = serializers.CharField(max_length=20)
+    items = BatchTransferItemSerializer(many=True, allow_empty=False, max_length=MAX_ITEMS)
+
+class AccountNumberBatchSerializer(serializers.Serializer):
+    MAX_ITEMS = 5000
+
+    account_numbers = serializers.ListField(child=serializers.CharField(max_length=20), allow_empty=False,
+                                            max_length=MAX_ITEMS)
+
 class SecurityQuestionSerializer(serializers.Serializer):
     security_answer = serializers.CharField(max_length=30)
 
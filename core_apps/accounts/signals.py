@@ -0,0 +1,13 @@
+from typing import Any, Type
+
+from django.db.models import Model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core_apps.accounts.interest import clear_interest_tiers
+from core_apps.accounts.models import InterestTier
+
+@receiver(post_save, sender=InterestTier)
+@receiver(post_delete, sender=InterestTier)
+def invalidate_interest_tiers(sender: Type[Model], instance: Model, **kwargs: Any) -> None:
+    clear_interest_tiers()
@@ -0,0 +1,179 @@
+import os
+from datetime import date, timedelta
+from tempfile import NamedTemporaryFile
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from django.core.files import File
+from django.db import IntegrityError, transaction
+from django.db.models import Max, QuerySet
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import landscape, letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import Paragraph, Table, TableStyle
+
+from .feeds import TRANSACTION_STATUS_LABELS, TRANSACTION_TYPE_LABELS
+from .models import BankAccount, LedgerEntry, StatementArtifact
+from .queries import month_start, next_month, period_bounds, transaction_history
+
+STATEMENT_FETCH_SIZE = 2000
+STATEMENT_ROWS_PER_PAGE = 20
+STATEMENT_PAGE_SIZE = landscape(letter)
+STATEMENT_MARGIN = 30
+STATEMENT_SHARD_SIZE = 50
+
+STATEMENT_FIELDS = (
+    'created_at', 'transaction_type', 'amount', 'description', 'transaction_status',
+    'sender__first_name', 'sender__last_name', 'receiver__first_name', 'receiver__last_name',
+    'sender_account__account_currency', 'receiver_account__account_currency',
+)
+
+STATEMENT_HEADER = ['Date', 'Type', 'Amount', 'Description', 'Status', 'Sender', 'Receiver']
+STATEMENT_COLUMN_WIDTHS = [1.8 * inch, 1.2 * inch, 1.2 * inch, 2.5 * inch, 1.2 * inch, 1.5 * inch, 1.5 * inch]
+STATEMENT_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.gray),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 10),
+    ('TOPPADDING', (0, 1), (-1, -1), 6),
+    ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('WORDWRAP', (0, 0), (-1, -1), True)
+])
+
+def display_name(first_name: str, last_name: str) -> str:
+    if first_name is None:
+        return 'N/A'
+    return f'{first_name} {last_name}'.strip()
+
+def statement_row(row: Tuple) -> List[str]:
+    (created_at, transaction_type, amount, description, transaction_status, sender_first_name, sender_last_name,
+     receiver_first_name, receiver_last_name, sender_currency, receiver_currency) = row
+    description = description or ''
+    return [
+        created_at.strftime('%Y-%m-%d %H:%M:%S'),
+        TRANSACTION_TYPE_LABELS.get(transaction_type, transaction_type),
+        f'{amount:.2f} {sender_currency or receiver_currency}',
+        description[:30] + '...' if len(description) > 30 else description,
+        TRANSACTION_STATUS_LABELS.get(transaction_status, transaction_status),
+        display_name(sender_first_name, sender_last_name),
+        display_name(receiver_first_name, receiver_last_name),
+    ]
+
+def statement_rows(transactions: QuerySet, chunk_size: int = STATEMENT_FETCH_SIZE) -> Iterator[List[str]]:
+    """
+    Yield formatted statement rows from a single joined query, fetched as value
+    tuples ``chunk_size`` rows at a time over a server-side cursor.
+    """
+    for row in transactions.values_list(*STATEMENT_FIELDS).iterator(chunk_size=chunk_size):
+        yield statement_row(row)
+
+def statement_pages(rows: Iterable[List[str]], rows_per_page: int = STATEMENT_ROWS_PER_PAGE) -> Iterator[List]:
+    page, emitted = [], False
+    for row in rows:
+        page.append(row)
+        if len(page) == rows_per_page:
+            yield page
+            page, emitted = [], True
+    if page or not emitted:
+        yield page
+
+def render_statement_pdf(title: str, rows: Iterable[List[str]], rows_per_page: int = STATEMENT_ROWS_PER_PAGE) -> str:
+    """
+    Render statement rows to a temporary PDF file and return its path. Each page
+    is drawn as its own fixed-size table and released before the next one is
+    built, so memory stays flat however long the statement is. The caller owns
+    the file and must delete it.
+    """
+    width, height = STATEMENT_PAGE_SIZE
+    heading = Paragraph(title, getSampleStyleSheet()['Title'])
+    with NamedTemporaryFile(prefix='statement-', suffix='.pdf', delete=False) as handle:
+        pdf = Canvas(handle, pagesize=STATEMENT_PAGE_SIZE)
+        top = height - STATEMENT_MARGIN
+        _, heading_height = heading.wrapOn(pdf, width - 2 * STATEMENT_MARGIN, height)
+        heading.drawOn(pdf, STATEMENT_MARGIN, top - heading_height)
+        top -= heading_height + 12
+
+        pages = statement_pages(rows, rows_per_page)
+        for number, page in enumerate(pages):
+            if number:
+                pdf.showPage()
+                top = height - STATEMENT_MARGIN
+            table = Table([STATEMENT_HEADER] + page, colWidths=STATEMENT_COLUMN_WIDTHS)
+            table.setStyle(STATEMENT_TABLE_STYLE)
+            table_width, table_height = table.wrapOn(pdf, width - 2 * STATEMENT_MARGIN, top)
+            table.drawOn(pdf, (width - table_width) / 2, top - table_height)
+        pdf.save()
+    return handle.name
+
+def statement_segments(start_date: date, end_date: date, today: date) -> List[Tuple[date, date, Optional[date]]]:
+    """
+    Split a statement range into ``(start, end, period)`` segments. Calendar
+    months that are closed and fully covered by the range carry their period
+    and can be served from a ``StatementArtifact``; everything else, such as
+    the open month or a partial month at either edge, has no period and is
+    rendered on demand, with adjacent on-demand days merged into one segment.
+    """
+    segments = []
+    open_period = month_start(today)
+    period = month_start(start_date)
+    while period <= end_date:
+        period_end = next_month(period) - timedelta(days=1)
+        segment_start, segment_end = max(start_date, period), min(end_date, period_end)
+        if segment_start == period and segment_end == period_end and period < open_period:
+            segments.append((segment_start, segment_end, period))
+        elif segments and segments[-1][2] is None:
+            segments[-1] = (segments[-1][0], segment_end, None)
+        else:
+            segments.append((segment_start, segment_end, None))
+        period = next_month(period)
+    return segments
+
+def period_ledger_position(account_id, period: date) -> int:
+    _, period_end = period_bounds(period)
+    return LedgerEntry.objects.filter(account_id=account_id, transaction__created_at__lte=period_end).aggregate(
+        position=Max('sequence'))['position'] or 0
+
+def monthly_statement(account: BankAccount, period: date) -> StatementArtifact:
+    """
+    Return the stored statement of ``account`` for the month starting at
+    ``period``, rendering it on first use. Artifacts are keyed by the ledger
+    position at the period end, so a posting that lands in the month later
+    produces a new artifact rather than serving a stale one.
+    """
+    position = period_ledger_position(account.id, period)
+    artifact = StatementArtifact.objects.filter(account=account, period=period, ledger_sequence=position).first()
+    if artifact:
+        return artifact
+
+    created_from, created_until = period_bounds(period)
+    transactions = transaction_history(account.user, account, created_from=created_from,
+                                       created_until=created_until).order_by('-created_at')
+    pdf_path = render_statement_pdf(f'Statement for account {account.account_number}, {period:%B %Y}',
+                                    statement_rows(transactions))
+    artifact = StatementArtifact(account=account, period=period, ledger_sequence=position)
+    try:
+        with open(pdf_path, 'rb') as pdf:
+            artifact.file.save(f'{account.account_number}-{period:%Y-%m}.pdf', File(pdf), save=False)
+    finally:
+        os.remove(pdf_path)
+
+    try:
+        with transaction.atomic():
+            artifact.save()
+    except IntegrityError:
+        artifact.file.delete(save=False)
+        return StatementArtifact.objects.get(account=account, period=period, ledger_sequence=position)
+
+    for stale in StatementArtifact.objects.filter(account=account, period=period, ledger_sequence__lt=position):
+        stale.file.delete(save=False)
+        stale.delete()
+    return artifact
@@ -1,116 +1,184 @@
-from io import BytesIO
-from celery import shared_task
+import os
+from contextlib import ExitStack
+from typing import List
+
+from celery import group, shared_task
 from dateutil import parser
 from loguru import logger
 from os import getenv
 from decimal import Decimal
 from datetime import timedelta
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import Q, Sum
+from django.core.cache import caches
+from django.db.models import Exists, OuterRef
 from django.utils.translation import gettext_lazy as _
-from django.db import transaction
 from django.utils import timezone
 
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import landscape, letter
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.units import inch
-from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
-
-from core_apps.accounts.models import BankAccount, Transaction
+from core_apps.accounts.models import BankAccount, LedgerEntry
 
 from .emails import send_transaction_pdf, send_suspicious_activity_alert
+from .fraud import detect_suspicious
+from .intents import purge_consumed_intents
+from .interest import accrue_interest_range, capitalize_interest_range, interest_shards
+from .ledger import snapshot_balances
+from .queries import day_bounds, month_start, period_bounds, transaction_history
+from .rollups import roll_up_daily_summaries
+from .statements import STATEMENT_SHARD_SIZE, monthly_statement, render_statement_pdf, statement_rows, \
+    statement_segments
 
 User = get_user_model()
 
+ROLLUP_LOCK_KEY = 'rollups:daily-summaries:lock'
+
 @shared_task
 def generate_transactions_PDF(user_id: str, start_date: str, end_date: str, account_number: str = None) -> None:
     try:
         user = User.objects.get(id=user_id)
         start_date = parser.parse(start_date).date()
         end_date = parser.parse(end_date).date()
-        transactions = Transaction.objects.filter(
-            Q(sender=user) | Q(receiver=user),
-            created_at__date__range=[start_date, end_date]
-        )
-
-        if account_number:
-            account = BankAccount.objects.get(account_number=account_number, user=user)
-            transactions = transactions.filter(Q(sender_account=account) | Q(receiver_account=account))
-
-        transactions = transactions.order_by('-created_at')
-        pdf = generate_PDF(start_date, end_date, transactions)
-        send_transaction_pdf(user, start_date, end_date, pdf)
+        account = BankAccount.objects.select_related('user').get(account_number=account_number, user=user) \
+            if account_number else None
+        segments = statement_segments(start_date, end_date, timezone.now().date()) if account \
+            else [(start_date, end_date, None)]
+
+        with ExitStack() as stack:
+            attachments = []
+            for segment_start, segment_end, period in segments:
+                if period:
+                    artifact = monthly_statement(account, period)
+                    attachments.append((f'statement_{account.account_number}_{period:%Y-%m}.pdf',
+                                        stack.enter_context(artifact.file.open('rb'))))
+                    continue
+                created_from, created_until = day_bounds(segment_start, segment_end)
+                transactions = transaction_history(user, account, created_from=created_from,
+                                                   created_until=created_until).order_by('-created_at')
+                pdf_path = render_statement_pdf(f'Transaction History from {segment_start} to {segment_end}',
+                                                statement_rows(transactions))
+                stack.callback(os.remove, pdf_path)
+                attachments.append((f'transactions_from_{segment_start}_to_{segment_end}.pdf',
+                                    stack.enter_context(open(pdf_path, 'rb'))))
+            send_transaction_pdf(user, start_date, end_date, attachments)
         return f'PDF generated and sent to {user.email}'
     except Exception as e:
         logger.error(f'Failed to generate transactions PDF for user {user_id}, Error: {str(e)}')
         return f'Failed to generate transactions PDF: {str(e)}'
 
-def generate_PDF(start_date, end_date, transactions: list[Transaction]) -> bytes:
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=landscape(letter), rightMargin=30, leftMargin=30, topMargin=30, 
-                            bottomMargin=18)
-    styles = getSampleStyleSheet()
-    
-    elements = []
-    header = Paragraph(f'Transaction History from {start_date} to {end_date}', styles['Title'])
-    elements.append(header)
-    elements.append(Spacer(1, 12))
-
-    data = []
-    data.append(['Date', 'Type', 'Amount', 'Description', 'Status', 'Sender', 'Receiver'])
-    for transaction in transactions:
-        data.append([
-            transaction.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-            transaction.get_transaction_type_display(),
-            f'{transaction.amount:.2f} {get_account_currency(transaction)}',
-            transaction.description[:30] + '...' if len(transaction.description) > 30 else transaction.description,
-            transaction.get_transaction_status_display(),
-            transaction.sender.get_full_name() if transaction.sender else 'N/A',
-            transaction.receiver.get_full_name() if transaction.receiver else 'N/A'
-        ])
-
-    col_widths = [1.8 * inch, 1.2 * inch, 1.2 * inch, 2.5 * inch, 1.2 * inch, 1.5 * inch, 1.5 * inch]
-    table = Table(data, colWidths=col_widths)
-    styles = TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.gray),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 1), (-1, -1), 10),
-        ('TOPPADDING', (0, 1), (-1, -1), 6),
-        ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('WORDWRAP', (0, 0), (-1, -1), True)
-    ])
-    table.setStyle(styles)
-    elements.append(table)
-
-    doc.build(elements)
-    buffer.seek(0)
-    pdf = buffer.getvalue()
-    buffer.close()
-    return pdf
-
-def get_account_currency(transaction: Transaction) -> str:
-    if transaction.sender_account:
-        return transaction.sender_account.get_account_currency_display()
-    return transaction.receiver_account.get_account_currency_display()
+@shared_task
+def generate_month_end_statements(period: str = None) -> str:
+    if period:
+        period = month_start(parser.parse(period).date())
+    else:
+        period = month_start(month_start(timezone.now().date()) - timedelta(days=1))
+    created_from, created_until = period_bounds(period)
+    posted_in_period = LedgerEntry.objects.filter(
+        account=OuterRef('pk'), transaction__created_at__gte=created_from, transaction__created_at__lte=created_until
+    )
+    account_ids = BankAccount.objects.filter(Exists(posted_in_period)).order_by('id').values_list('id', flat=True)
+
+    shards, shard = [], []
+    for account_id in account_ids.iterator(chunk_size=2000):
+        shard.append(str(account_id))
+        if len(shard) == STATEMENT_SHARD_SIZE:
+            shards.append(shard)
+            shard = []
+    if shard:
+        shards.append(shard)
+
+    group(render_statement_shard.s(period.isoformat(), shard) for shard in shards).apply_async()
+    accounts_count = sum(len(shard) for shard in shards)
+    logger.info(f'Dispatched {len(shards)} statement shards for {accounts_count} accounts for {period:%Y-%m}')
+    return f'Month-end statements for {period:%Y-%m} dispatched for {accounts_count} accounts in {len(shards)} shards'
+
+@shared_task(bind=True)
+def render_statement_shard(self, period: str, account_ids: List[str]) -> str:
+    period = parser.parse(period).date()
+    accounts = BankAccount.objects.select_related('user').filter(id__in=account_ids).order_by('id')
+    failed = 0
+    for done, account in enumerate(accounts, start=1):
+        try:
+            monthly_statement(account, period)
+        except Exception as e:
+            failed += 1
+            logger.error(f'Failed to render {period:%Y-%m} statement for account {account.account_number}, '
+                         f'Error: {str(e)}')
+        self.update_state(state='PROGRESS', meta={'period': period.isoformat(), 'done': done,
+                                                  'total': len(account_ids), 'failed': failed})
+    logger.info(f'Statement shard for {period:%Y-%m} done: {len(account_ids) - failed} rendered, {failed} failed')
+    return f'{len(account_ids) - failed} statements rendered for {period:%Y-%m}, {failed} failed'
 
 @shared_task
 def apply_daily_interest() -> str:
-    saving_accounts = BankAccount.objects.filter(account_type = BankAccount.BankAccountType.SAVING)
-    for account in saving_accounts:
-        with transaction.atomic():
-            account.apply_daily_interest()
-    logger.info(f'Done applying daily interest to {saving_accounts.count()} accounts')
-    return f'Daily interest applied to {saving_accounts.count()} accounts'
+    accrual_date = timezone.now().date()
+    shards = interest_shards()
+    group(accrue_interest_shard.s(first_id, last_id, size, accrual_date.isoformat())
+          for first_id, last_id, size in shards).apply_async()
+    accounts_count = sum(size for first_id, last_id, size in shards)
+    logger.info(f'Dispatched {len(shards)} interest accrual shards for {accounts_count} accounts for {accrual_date}')
+    return f'Daily interest accrual for {accrual_date} dispatched for {accounts_count} accounts in {len(shards)} shards'
+
+@shared_task(bind=True)
+def accrue_interest_shard(self, first_id: str, last_id: str, size: int, accrual_date: str) -> str:
+    def report(processed: int, accrued: int, total: Decimal) -> None:
+        self.update_state(state='PROGRESS', meta={'first_id': first_id, 'last_id': last_id, 'done': processed,
+                                                  'total': size, 'accrued': accrued, 'interest': str(total)})
+
+    processed, accrued, total = accrue_interest_range(first_id, last_id, parser.parse(accrual_date).date(),
+                                                      on_chunk=report)
+    logger.info(f'Interest accrual shard {first_id}..{last_id} for {accrual_date} done: {accrued} of {processed} '
+                f'accounts accrued {total} in total')
+    return f'Interest of {total} accrued for {accrued} of {processed} accounts'
+
+@shared_task
+def capitalize_monthly_interest(period: str = None) -> str:
+    if period:
+        period = month_start(parser.parse(period).date())
+    else:
+        period = month_start(month_start(timezone.now().date()) - timedelta(days=1))
+    shards = interest_shards()
+    group(capitalize_interest_shard.s(first_id, last_id, size, period.isoformat())
+          for first_id, last_id, size in shards).apply_async()
+    accounts_count = sum(size for first_id, last_id, size in shards)
+    logger.info(f'Dispatched {len(shards)} interest capitalization shards for {accounts_count} accounts for '
+                f'{period:%Y-%m}')
+    return f'Interest capitalization for {period:%Y-%m} dispatched for {accounts_count} accounts in ' + \
+        f'{len(shards)} shards'
+
+@shared_task(bind=True)
+def capitalize_interest_shard(self, first_id: str, last_id: str, size: int, period: str) -> str:
+    def report(processed: int, credited: int, total: Decimal) -> None:
+        self.update_state(state='PROGRESS', meta={'first_id': first_id, 'last_id': last_id, 'done': processed,
+                                                  'total': size, 'credited': credited, 'interest': str(total)})
+
+    processed, credited, total = capitalize_interest_range(first_id, last_id, parser.parse(period).date(),
+                                                           on_chunk=report)
+    logger.info(f'Interest capitalization shard {first_id}..{last_id} for {period} done: {credited} of {processed} '
+                f'accounts credited {total} in total')
+    return f'Interest of {total} capitalized to {credited} of {processed} accounts'
+
+@shared_task
+def snapshot_account_balances() -> str:
+    created = snapshot_balances()
+    logger.info(f'Took {created} account balance snapshots')
+    return f'Balance snapshots taken for {created} accounts'
+
+@shared_task
+def roll_up_account_summaries() -> str:
+    cache = caches[settings.ROLLUP_LOCK_CACHE]
+    if not cache.add(ROLLUP_LOCK_KEY, 1, timeout=settings.CELERY_TASK_TIME_LIMIT):
+        return 'Daily summary roll-up already running'
+    try:
+        accounts, entries = roll_up_daily_summaries()
+    finally:
+        cache.delete(ROLLUP_LOCK_KEY)
+    logger.info(f'Rolled up {entries} ledger entries into daily summaries for {accounts} accounts')
+    return f'Daily summaries updated for {accounts} accounts from {entries} ledger entries'
+
+@shared_task
+def report_velocity_breaches(suspicious_activities: List[str]) -> str:
+    num_activities = send_suspicious_activity_alert(suspicious_activities)
+    return f'{num_activities} velocity breaches reported'
 
 @shared_task
 def detect_suspicious_activities():
@@ -118,45 +186,8 @@ def detect_suspicious_activities():
     FREQUENT_TRANSACTION_THRESHOLD = int(getenv('FREQUENT_TRANSACTION_THRESHOLD'))
     TIME_WINDOW_HOURS = int(getenv('TIME_WINDOW_HOURS'))
 
-    TIME_WINDOW = timedelta(hours=TIME_WINDOW_HOURS)
-    now = timezone.now()
-    time_threshold = now - TIME_WINDOW
-
-    suspicies_activities = []
-
-    # Detect large transactions activity
-    large_transactions = Transaction.objects.filter(
-        amount__gte=LARGE_TRANSACTION_THRESHOLD, created_at__gte=time_threshold
-    )
-    for transaction in large_transactions:
-        suspicies_activities.append(
-            f'Large transaction detected: Amount: {transaction.amount}, by user {transaction.user.email}'
-        )
-
-    # Detect frequent transactions activity
-    users = User.objects.all()
-    for user in users:
-        transactions_count = Transaction.objects.filter(user=user, created_at__gte=time_threshold).count()
-        if transactions_count >= FREQUENT_TRANSACTION_THRESHOLD:
-            suspicies_activities.append(
-                f'Frequent transaction detected: {transactions_count}, by user {user.email}'
-            )
-
-    # Detect unusual account balance change
-    accounts = BankAccount.objects.all()
-    for account in accounts:
-        balance_change = Transaction.objects.filter(
-            Q(sender_account=account) | Q(receiver_account=account),
-            created_at__gte=time_threshold
-        ).aggregate(
-            total_sent = Sum('amount', filter=Q(sender_account=account)),
-            total_received = Sum('amount', filter=Q(receiver_account=account))
-        )
-        total_change = (balance_change['total_sent'] or Decimal(0)) - (balance_change['total_received'] or Decimal(0))
-        if abs(total_change) > LARGE_TRANSACTION_THRESHOLD:
-            suspicies_activities.append(
-                f'Large balance change detected: Total change: {total_change}, by account {account.account_number}'
-            )
+    suspicies_activities = detect_suspicious(LARGE_TRANSACTION_THRESHOLD, FREQUENT_TRANSACTION_THRESHOLD,
+                                             timedelta(hours=TIME_WINDOW_HOURS))
 
     if suspicies_activities:
         num_activities = send_suspicious_activity_alert(suspicies_activities)
@@ -167,4 +198,7 @@ def detect_suspicious_activities():
             return 'Suspicious activities check completed. Activities detected but alert email failed to send'
     return 'Suspicious activities check completed. No suspicious activities detected'
 
-
+@shared_task
+def purge_expired_intents() -> str:
+    deleted = purge_consumed_intents()
+    return f'Deleted {deleted} expired intent marks'
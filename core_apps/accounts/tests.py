@@ -0,0 +1,167 @@
+import time
+from datetime import timedelta
+from decimal import Decimal
+from typing import Any, List, Tuple
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core_apps.accounts import velocity
+
+from core_apps.accounts.fraud import account_flows, frequent_users, large_transactions
+from core_apps.accounts.management.seed import seed_transaction_history
+from core_apps.accounts.models import BalanceSnapshot, BankAccount, LedgerEntry, Transaction
+from core_apps.accounts.posting import post_deposit, post_transfer
+from core_apps.accounts.queries import day_bounds, transaction_history
+from core_apps.accounts.velocity import MemoryVelocityCounters
+
+User = get_user_model()
+
+SCANNED_TABLES = (Transaction._meta.db_table, LedgerEntry._meta.db_table)
+
+class TransactionReadPathPlanTests(TestCase):
+    """
+    Seed a transaction history large enough for the planner to prefer the
+    indexes, then assert with ``EXPLAIN`` that no transaction read path falls
+    back to a sequential scan of the transaction or ledger tables.
+    """
+    @classmethod
+    def setUpTestData(cls) -> None:
+        accounts, _ = seed_transaction_history(users=200, transactions_per_user=100)
+        cls.account = accounts[0]
+        cls.user = cls.account.user
+
+    def read_paths(self) -> List[Tuple[str, Any]]:
+        now = timezone.now()
+        created_from, created_until = day_bounds((now - timedelta(days=30)).date(), now.date())
+        time_threshold = now - timedelta(hours=1)
+        user, account = self.user, self.account
+        return [
+            ('TransactionListApiView (all accounts)',
+             transaction_history(user).order_by('-created_at', '-id')[:11]),
+            ('TransactionListApiView (account, date range)',
+             transaction_history(user, account, created_from=created_from, created_until=created_until)
+             .order_by('-created_at', '-id')[:11]),
+            ('generate_transactions_PDF (all accounts)',
+             transaction_history(user, created_from=created_from, created_until=created_until)
+             .order_by('-created_at')),
+            ('generate_transactions_PDF (account)',
+             transaction_history(user, account, created_from=created_from, created_until=created_until)
+             .order_by('-created_at')),
+            ('balance_as_of (snapshot)',
+             BalanceSnapshot.objects.filter(account=account, created_at__lte=now).order_by('-created_at')[:1]),
+            ('balance_as_of (ledger tail)',
+             LedgerEntry.objects.filter(account=account, sequence__gt=account.ledger_sequence - 20,
+                                        transaction__created_at__lte=now)),
+            ('detect_suspicious_activities (large transactions)',
+             large_transactions(Decimal('50000'), time_threshold)),
+            ('detect_suspicious_activities (frequent transactions)',
+             frequent_users(10, time_threshold)),
+            ('detect_suspicious_activities (balance change, sent)',
+             account_flows(time_threshold, 'sender_account')),
+            ('detect_suspicious_activities (balance change, received)',
+             account_flows(time_threshold, 'receiver_account')),
+        ]
+
+    def test_read_paths_use_index_scans(self) -> None:
+        for name, queryset in self.read_paths():
+            with self.subTest(name):
+                plan = queryset.explain()
+                scans = [table for table in SCANNED_TABLES if f'Seq Scan on {table}' in plan]
+                self.assertEqual(scans, [], f'{name} fell back to a sequential scan:\n{plan}')
+
+class MemoryVelocityCountersTests(TestCase):
+    def setUp(self) -> None:
+        self.counters = MemoryVelocityCounters(timedelta(hours=1), 60)
+        self.start = 1_000_000 * 60
+
+    def test_counts_and_amounts_add_up_within_the_window(self) -> None:
+        self.assertEqual(self.counters.record('user', 'jane', 10000, now=self.start), (1, 10000))
+        self.assertEqual(self.counters.record('user', 'jane', 2550, now=self.start + 30), (2, 12550))
+        self.assertEqual(self.counters.record('user', 'jane', 450, now=self.start + 59 * 60), (3, 13000))
+
+    def test_buckets_slide_out_of_the_window(self) -> None:
+        self.counters.record('user', 'jane', 10000, now=self.start)
+        self.counters.record('user', 'jane', 2000, now=self.start + 30 * 60)
+        self.assertEqual(self.counters.record('user', 'jane', 500, now=self.start + 60 * 60), (2, 2500))
+        self.assertEqual(self.counters.record('user', 'jane', 100, now=self.start + 2 * 60 * 60), (1, 100))
+
+    def test_subjects_are_counted_separately(self) -> None:
+        self.counters.record('user', 'jane', 10000, now=self.start)
+        self.assertEqual(self.counters.record('user', 'john', 300, now=self.start), (1, 300))
+        self.assertEqual(self.counters.record('account', 'jane', 300, now=self.start), (1, 300))
+
+    def test_alerts_once_per_window(self) -> None:
+        self.assertTrue(self.counters.mark_alerted('frequent:jane'))
+        self.assertFalse(self.counters.mark_alerted('frequent:jane'))
+        self.assertTrue(self.counters.mark_alerted('frequent:john'))
+
+@override_settings(VELOCITY_COUNTERS_BACKEND='memory')
+@mock.patch.dict('os.environ', {'TIME_WINDOW_HOURS': '1', 'LARGE_TRANSACTION_THRESHOLD': '1000',
+                                'FREQUENT_TRANSACTION_THRESHOLD': '3'})
+class VelocityPostingTests(TestCase):
+    """
+    Postings feed the in-memory velocity counters once they commit, and
+    breaches of the ``detect_suspicious_activities`` rules are reported
+    without waiting for the batch run.
+    """
+    def setUp(self) -> None:
+        velocity._counters = None
+        self.addCleanup(setattr, velocity, '_counters', None)
+        self.jane = self.create_customer('jane', 10000001)
+        self.john = self.create_customer('john', 10000002)
+        self.jane_account = self.create_account(self.jane, '1000000000000001')
+        self.john_account = self.create_account(self.john, '1000000000000002')
+        report = mock.patch('core_apps.accounts.tasks.report_velocity_breaches')
+        self.report = report.start()
+        self.addCleanup(report.stop)
+
+    def create_customer(self, name: str, id_no: int) -> Any:
+        return User.objects.create_user(
+            email=f'{name}@example.com', password='Str0ng-Passw0rd!', first_name=name.title(), last_name='Doe',
+            id_no=id_no, security_question=User.SecurityQuestions.BIRTH_CITY, security_answer='Cairo',
+        )
+
+    def create_account(self, user: Any, account_number: str) -> BankAccount:
+        return BankAccount.objects.create(user=user, account_number=account_number,
+                                          account_status=BankAccount.AccountStatus.ACTIVE)
+
+    def post(self, posting, *args: Any, **kwargs: Any) -> Transaction:
+        with self.captureOnCommitCallbacks(execute=True):
+            return posting(*args, **kwargs)
+
+    def reported_breaches(self) -> List[str]:
+        return [breach for call in self.report.delay.call_args_list for breach in call.args[0]]
+
+    def window_totals(self, scope: str, subject: Any) -> Tuple[int, int]:
+        counters = velocity.velocity_counters()
+        buckets = counters.increment_and_read('probe', 0, counters.bucket_keys(scope, subject, time.time()))
+        return sum(count for count, _ in buckets), sum(amount for _, amount in buckets)
+
+    def test_postings_update_the_user_and_account_windows(self) -> None:
+        self.post(post_deposit, self.jane_account.id, Decimal('500.00'), description='Salary')
+        self.post(post_transfer, self.jane_account.id, self.john_account.id, Decimal('120.50'), user=self.jane,
+                  description='Rent share')
+
+        self.assertEqual(self.window_totals('user', self.jane.id), (2, 62050))
+        # Account windows track outflows as positive and inflows as negative cents
+        self.assertEqual(self.window_totals('account', self.jane_account.id), (2, -50000 + 12050))
+        self.assertEqual(self.window_totals('account', self.john_account.id), (1, -12050))
+        self.report.delay.assert_not_called()
+
+    def test_large_transaction_is_reported(self) -> None:
+        self.post(post_deposit, self.jane_account.id, Decimal('1500.00'), description='Bonus')
+
+        breaches = self.reported_breaches()
+        self.assertIn('Large transaction detected: Amount: 1500.00, by user jane@example.com', breaches)
+        self.assertIn('Large balance change detected: Total change: -1500, by account 1000000000000001',
+                      breaches)
+
+    def test_frequent_transactions_are_reported_once_per_window(self) -> None:
+        for _ in range(5):
+            self.post(post_deposit, self.jane_account.id, Decimal('10.00'), description='Top up')
+
+        self.assertEqual(self.reported_breaches(),
+                         ['Frequent transaction detected: 3, by user jane@example.com'])
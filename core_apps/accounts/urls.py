@@ -1,7 +1,9 @@
 from django.urls import path
 from .views import BankAccountVerificationView, DepositView, InitiateWithdrawalView, \
         VerifyUsernameAndWithdrawApiView, InitiateTransferView, VerifySecurityQuestionAndTransferApiView, \
-        VerifyOTPAndTransferView, TransactionListApiView, TransactionPDFApiView
+        VerifyOTPAndTransferView, TransactionListApiView, TransactionPDFApiView, InitiateBatchTransferView, \
+        VerifyOTPAndBatchTransferView, TransactionExportApiView, AccountAnalyticsApiView, \
+        BalanceAsOfApiView, AccountNumberBatchVerificationApiView
 
 urlpatterns = [
     path('verify/<uuid:pk>/', BankAccountVerificationView.as_view(), name='account_verification'),
@@ -13,6 +15,13 @@ urlpatterns = [
     path('transfer/verify-security-question/', VerifySecurityQuestionAndTransferApiView.as_view(), 
          name='verify_security_question'),
     path('transfer/verify-otp/', VerifyOTPAndTransferView.as_view(), name='verify_otp'),
+    path('transfer/batch/initiate/', InitiateBatchTransferView.as_view(), name='initiate_batch_transfer'),
+    path('transfer/batch/verify-otp/', VerifyOTPAndBatchTransferView.as_view(), name='verify_otp_batch_transfer'),
     path('transactions/', TransactionListApiView.as_view(), name='transaction_list'),
+    path('transactions/export/', TransactionExportApiView.as_view(), name='transaction_export'),
     path('transactions/pdf/', TransactionPDFApiView.as_view(), name='transaction_pdf'),
+    path('analytics/', AccountAnalyticsApiView.as_view(), name='account_analytics'),
+    path('balance-as-of/', BalanceAsOfApiView.as_view(), name='balance_as_of'),
+    path('verify-account-numbers/', AccountNumberBatchVerificationApiView.as_view(),
+         name='verify_account_numbers'),
 ]
@@ -1,14 +1,19 @@
-import secrets
-import string
 from os import getenv
-from typing import Union, List
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
+import numpy as np
+from django.conf import settings
 from django.db import transaction
+
+from core_apps.common.numbering import NumberPool, reserve_numbers
+
 from .emails import send_account_creation_email
 
 from .models import BankAccount
 
-def generate_account_number(currency: str) -> str:
+ACCOUNT_NUMBER_LENGTH = 16
+
+def account_number_prefix(currency: str) -> str:
     bank_code = getenv('BANK_CODE')
     branch_code = getenv('BANK_BRANCH_CODE')
 
@@ -22,14 +27,59 @@ def generate_account_number(currency: str) -> str:
     if not currency_code:
         raise ValueError(f'Invalid currency: {currency}')
     
-    prefix = f'{bank_code}{branch_code}{currency_code}'
-    remaining_digits = 16 - len(prefix) - 1
-    random_digits = ''.join(secrets.choice(string.digits) for _ in range(remaining_digits))
-    
-    partial_account_number = f'{prefix}{random_digits}'
-    check_digit = calculate_luhn_check_digit(partial_account_number)
+    return f'{bank_code}{branch_code}{currency_code}'
+
+def account_number_prefixes() -> Dict[str, str]:
+    prefixes = {}
+    for currency in BankAccount.AccountCurrency.values:
+        try:
+            prefixes[currency] = account_number_prefix(currency)
+        except ValueError:
+            continue
+    return prefixes
 
-    return f'{partial_account_number}{check_digit}'
+def validate_account_numbers(account_numbers: Sequence[str]) -> Tuple[np.ndarray, List[Optional[str]]]:
+    """
+    Validate a batch of account numbers at once with the rules
+    ``generate_account_number`` issues them by: 16 ASCII digits, the
+    ``calculate_luhn_check_digit`` check digit and a known bank/branch/currency
+    prefix. Returns a boolean array of validity and the currency of each valid
+    number.
+    """
+    count = len(account_numbers)
+    valid = np.zeros(count, dtype=bool)
+    currencies: List[Optional[str]] = [None] * count
+    if not count:
+        return valid, currencies
+
+    numbers = np.char.encode(np.array(account_numbers, dtype=str), 'ascii', 'replace')
+    well_formed = (np.char.str_len(numbers) == ACCOUNT_NUMBER_LENGTH) & np.char.isdigit(numbers)
+    if well_formed.any():
+        digits = np.frombuffer(numbers[well_formed].astype(f'S{ACCOUNT_NUMBER_LENGTH}').tobytes(), dtype=np.uint8) \
+            .reshape(-1, ACCOUNT_NUMBER_LENGTH).astype(np.int16) - ord('0')
+        payload = digits[:, :-1]
+        doubled = payload[:, -2::-2] * 2
+        doubled -= 9 * (doubled > 9)
+        check_digits = (10 - (doubled.sum(axis=1) + payload[:, -1::-2].sum(axis=1)) % 10) % 10
+        valid[well_formed] = check_digits == digits[:, -1]
+
+    known_prefix = np.zeros(count, dtype=bool)
+    for currency, prefix in account_number_prefixes().items():
+        matched = valid & ~known_prefix & np.char.startswith(numbers, prefix.encode('ascii'))
+        for index in np.flatnonzero(matched):
+            currencies[index] = currency
+        known_prefix |= matched
+    return valid & known_prefix, currencies
+
+def reserve_account_numbers(prefix: str, count: int) -> List[str]:
+    return reserve_numbers(prefix, count, ACCOUNT_NUMBER_LENGTH, calculate_luhn_check_digit,
+                           getenv('ACCOUNT_NUMBER_SECRET_KEY').encode('utf8'), BankAccount.objects.all(),
+                           'account_number')
+
+account_numbers = NumberPool(reserve_account_numbers, settings.ACCOUNT_NUMBER_BLOCK_SIZE)
+
+def generate_account_number(currency: str) -> str:
+    return account_numbers.take(account_number_prefix(currency))[0]
 
 def calculate_luhn_check_digit(number: str) -> int:
     def split_into_digits(n: Union[str, int]) -> List[int]:
@@ -46,10 +96,7 @@ def calculate_luhn_check_digit(number: str) -> int:
 
 def create_bank_account(user, account_type: str, account_currency: str) -> BankAccount:
     with transaction.atomic():
-        while True:
-            account_number = generate_account_number(account_currency)
-            if not BankAccount.objects.filter(account_number=account_number).exists():
-                break
+        account_number = generate_account_number(account_currency)
         is_primary = not BankAccount.objects.filter(user=user).exists()
         bank_account = BankAccount.objects.create(
             user=user,
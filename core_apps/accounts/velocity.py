@@ -0,0 +1,168 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from os import getenv
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from loguru import logger
+
+from .models import Transaction
+
+CENTS = Decimal(100)
+
+class VelocityCounters(ABC):
+    """
+    Sliding-window transaction counters. The window is split into a fixed
+    number of time buckets, each holding a count and an amount in cents, so
+    recording a transaction and reading the window total cost the same however
+    many transactions the window holds.
+    """
+    def __init__(self, window: timedelta, buckets: int) -> None:
+        self.bucket_seconds = max(1, int(window.total_seconds()) // buckets)
+        self.buckets = -(-int(window.total_seconds()) // self.bucket_seconds)
+        self.ttl = self.bucket_seconds * (self.buckets + 1)
+
+    def bucket_keys(self, scope: str, subject: str, now: float) -> List[str]:
+        current = int(now) // self.bucket_seconds
+        return [f'velocity:{scope}:{subject}:{bucket}' for bucket in range(current - self.buckets + 1, current + 1)]
+
+    def record(self, scope: str, subject: str, amount_cents: int, now: Optional[float] = None) -> Tuple[int, int]:
+        """
+        Add one transaction of ``amount_cents`` to the current bucket and return
+        the ``(count, amount_cents)`` totals over the window.
+        """
+        keys = self.bucket_keys(scope, subject, time.time() if now is None else now)
+        buckets = self.increment_and_read(keys[-1], amount_cents, keys)
+        return sum(count for count, _ in buckets), sum(amount for _, amount in buckets)
+
+    @abstractmethod
+    def increment_and_read(self, key: str, amount_cents: int, keys: List[str]) -> List[Tuple[int, int]]:
+        ...
+
+    @abstractmethod
+    def mark_alerted(self, key: str) -> bool:
+        """
+        Return True only the first time ``key`` is marked within the window, so
+        a sustained breach raises one alert per window instead of one per
+        transaction.
+        """
+
+class RedisVelocityCounters(VelocityCounters):
+    def __init__(self, client, window: timedelta, buckets: int) -> None:
+        super().__init__(window, buckets)
+        self.client = client
+
+    def increment_and_read(self, key: str, amount_cents: int, keys: List[str]) -> List[Tuple[int, int]]:
+        pipeline = self.client.pipeline(transaction=False)
+        pipeline.hincrby(key, 'count', 1)
+        pipeline.hincrby(key, 'amount', amount_cents)
+        pipeline.expire(key, self.ttl)
+        for bucket_key in keys:
+            pipeline.hmget(bucket_key, 'count', 'amount')
+        results = pipeline.execute()[3:]
+        return [(int(count or 0), int(amount or 0)) for count, amount in results]
+
+    def mark_alerted(self, key: str) -> bool:
+        return bool(self.client.set(f'velocity:alerted:{key}', 1, nx=True, ex=self.ttl))
+
+class MemoryVelocityCounters(VelocityCounters):
+    """
+    In-process stand-in for ``RedisVelocityCounters`` for tests and local runs
+    without Redis. Counters are not shared between processes.
+    """
+    def __init__(self, window: timedelta, buckets: int) -> None:
+        super().__init__(window, buckets)
+        self.lock = threading.Lock()
+        self.counters: Dict[str, List] = {}
+        self.alerts: Dict[str, float] = {}
+
+    def increment_and_read(self, key: str, amount_cents: int, keys: List[str]) -> List[Tuple[int, int]]:
+        now = time.monotonic()
+        with self.lock:
+            self.prune(now)
+            counter = self.counters.setdefault(key, [0, 0, 0])
+            counter[0] += 1
+            counter[1] += amount_cents
+            counter[2] = now + self.ttl
+            return [tuple(self.counters[bucket_key][:2]) if bucket_key in self.counters else (0, 0)
+                    for bucket_key in keys]
+
+    def mark_alerted(self, key: str) -> bool:
+        now = time.monotonic()
+        with self.lock:
+            if self.alerts.get(key, 0) > now:
+                return False
+            self.alerts[key] = now + self.ttl
+            return True
+
+    def prune(self, now: float) -> None:
+        for key in [key for key, (_, _, expires_at) in self.counters.items() if expires_at <= now]:
+            del self.counters[key]
+
+_counters: Optional[VelocityCounters] = None
+
+def velocity_counters() -> VelocityCounters:
+    global _counters
+    if _counters is None:
+        window = timedelta(hours=int(getenv('TIME_WINDOW_HOURS')))
+        if settings.VELOCITY_COUNTERS_BACKEND == 'memory':
+            _counters = MemoryVelocityCounters(window, settings.VELOCITY_BUCKETS)
+        else:
+            from django_redis import get_redis_connection
+
+            _counters = RedisVelocityCounters(get_redis_connection(settings.VELOCITY_REDIS_CACHE), window,
+                                              settings.VELOCITY_BUCKETS)
+    return _counters
+
+def velocity_breaches(transaction: Transaction, counters: VelocityCounters) -> List[str]:
+    large_threshold = Decimal(getenv('LARGE_TRANSACTION_THRESHOLD'))
+    frequent_threshold = int(getenv('FREQUENT_TRANSACTION_THRESHOLD'))
+    amount_cents = int(transaction.amount * CENTS)
+    email = transaction.user.email if transaction.user_id else None
+    breaches = []
+
+    if transaction.amount >= large_threshold:
+        breaches.append(f'Large transaction detected: Amount: {transaction.amount}, by user {email}')
+
+    if transaction.user_id:
+        transactions_count, _ = counters.record('user', transaction.user_id, amount_cents)
+        if transactions_count >= frequent_threshold and counters.mark_alerted(f'frequent:{transaction.user_id}'):
+            breaches.append(f'Frequent transaction detected: {transactions_count}, by user {email}')
+
+    changes = defaultdict(int)
+    account_numbers = {}
+    for account, sign in ((transaction.sender_account, 1), (transaction.receiver_account, -1)):
+        if account is not None:
+            changes[account.id] += sign * amount_cents
+            account_numbers[account.id] = account.account_number
+    for account_id, change in changes.items():
+        _, total_change = counters.record('account', account_id, change)
+        if abs(total_change) > large_threshold * CENTS and counters.mark_alerted(f'balance:{account_id}'):
+            breaches.append(f'Large balance change detected: Total change: {Decimal(total_change) / CENTS}, '
+                            f'by account {account_numbers[account_id]}')
+    return breaches
+
+def check_velocity(transactions: Iterable[Transaction]) -> None:
+    """
+    Update the velocity counters for freshly posted transactions and report any
+    rule of ``detect_suspicious_activities`` they breach, without waiting for
+    the next batch run. Counter failures are logged and never fail a posting.
+    """
+    try:
+        counters = velocity_counters()
+        breaches = [breach for transaction in transactions for breach in velocity_breaches(transaction, counters)]
+    except Exception as e:
+        logger.warning(f'Velocity counters unavailable, skipping inline fraud checks: {e}')
+        return
+    if breaches:
+        from .tasks import report_velocity_breaches
+
+        logger.warning(f'Velocity checks flagged {len(breaches)} suspicious activities')
+        try:
+            report_velocity_breaches.delay(breaches)
+        except Exception as e:
+            logger.error(f'Failed to queue velocity breach alert, Error: {str(e)}')
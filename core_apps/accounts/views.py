@@ -1,8 +1,10 @@
-from typing import Any
+import csv
+import json
+from typing import Any, Iterator
 
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from django.db import transaction
-from django.db.models import Q
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics, status, serializers
 from rest_framework.request import Request
@@ -14,17 +16,28 @@ from loguru import logger
 from dateutil import parser
 from decimal import Decimal
 
+from core_apps.common.idempotency import idempotent
+from core_apps.common.outbox import enqueue_emails
 from core_apps.common.permissions import IsAccountExecutive, IsTeller
 from core_apps.common.renderers import GenericJSONRenderer
 from core_apps.common.utils import generate_otp
-from core_apps.common.pagination import StandardResultsSetPagination
+from core_apps.common.pagination import KeysetPagination, StandardResultsSetPagination
 
 from .models import BankAccount, Transaction
+from .feeds import TRANSACTION_EXPORT_COLUMNS, project_transactions, transaction_feed, transaction_row
+from .intents import BATCH_TRANSFER_INTENT, TRANSFER_INTENT, WITHDRAWAL_INTENT, IntentError, consume_intent, \
+    issue_intent
+from .ledger import balance_as_of
+from .queries import month_start, transaction_history
+from .rollups import account_analytics
+from .posting import InsufficientFundsError, post_deposit, post_transfer, post_transfer_batch, post_withdrawal
 from .serializers import BankAccountVerificationSerializer, CustomerInfoSerializer, DepositSerializer, \
-    TransactionSerializer, UsernameVerificationSerializer, SecurityQuestionSerializer, OTPVerificationSerializer
+    TransactionSerializer, UsernameVerificationSerializer, SecurityQuestionSerializer, OTPVerificationSerializer, \
+    BatchTransferSerializer, AccountNumberBatchSerializer
 from .emails import send_full_activation_email, send_deposite_email, send_withdrawal_email, send_transfer_email, \
-    send_transfer_otp_email
+    send_transfer_otp_email, transfer_emails
 from .tasks import generate_transactions_PDF
+from .utils import validate_account_numbers
 
 class BankAccountVerificationView(generics.UpdateAPIView):
     queryset = BankAccount.objects.all()
@@ -81,6 +94,7 @@ class DepositView(generics.CreateAPIView):
         except BankAccount.DoesNotExist:
             return Response({'error': 'Invalid account number'}, status=status.HTTP_400_BAD_REQUEST)
         
+    @idempotent
     @transaction.atomic
     def create(self, request: Request, *args: Any, **kwargs: Any) -> Response:
         serializer = self.get_serializer(data=request.data)
@@ -88,21 +102,11 @@ class DepositView(generics.CreateAPIView):
         bank_account = serializer.context['account']
         amount = serializer.validated_data['amount']
         try:
-            bank_account.account_balance += amount
-            bank_account.full_clean()
-            bank_account.save()
+            deposit = post_deposit(bank_account.id, amount,
+                                   description=f'Deposit of {amount} to account {bank_account.account_number}')
+            bank_account = deposit.receiver_account
             logger.info(f'Deposit of {amount} made to account {bank_account.account_number} by teller ' + \
                         f'{request.user.email}')
-            
-            Transaction.objects.create(
-                user=bank_account.user,
-                receiver=bank_account.user,
-                receiver_account=bank_account,
-                amount=amount,
-                description=f'Deposit of {amount} to account {bank_account.account_number}',
-                transaction_type=Transaction.TransactionType.DEPOSIT,
-                transaction_status=Transaction.TransactionStatus.SUCCESS
-            )
 
             send_deposite_email(user=bank_account.user, user_email=bank_account.user.email, amount=amount,
                                 currency=bank_account.account_currency, new_balance=bank_account.account_balance,
@@ -145,14 +149,15 @@ class InitiateWithdrawalView(generics.CreateAPIView):
         amount = serializer.validated_data['amount']
         if bank_account.account_balance < amount:
             return Response({'error': 'Insufficient funds for withdraw'}, status=status.HTTP_400_BAD_REQUEST)
-        request.session['withdrawal_data'] = {
+        intent = issue_intent(request.user, WITHDRAWAL_INTENT, {
             'account_number': account_number,
             'amount': str(amount)
-        }
-        logger.info('Withdraw data is saved in session')
+        })
+        logger.info(f'Withdrawal intent issued for account {account_number}')
         return Response({
             'message': 'Withdrawal initiated successfully, Please verify your username to complete the withdrawal',
-            'next_step': 'Verify your username to complete the withdrawal'
+            'next_step': 'Verify your username to complete the withdrawal',
+            'intent': intent
         }, status=status.HTTP_200_OK)
 
 class VerifyUsernameAndWithdrawApiView(generics.CreateAPIView):
@@ -160,16 +165,17 @@ class VerifyUsernameAndWithdrawApiView(generics.CreateAPIView):
     renderer_classes = [GenericJSONRenderer]
     object_label ='verify_username_and_withdraw'
 
+    @idempotent
     @transaction.atomic
     def create(self, request: Request, *args: Any, **kwargs: Any) -> Response:
         serializer = self.get_serializer(data=request.data, context={'request': request})
         serializer.is_valid(raise_exception=True)
 
-        withdrawal_data = request.session.get('withdrawal_data', None)
-        if not withdrawal_data:
-            return Response({'error': 'No pending withdrawal data found. please initiate a withdrawal data first'}, 
-                            status=status.HTTP_400_BAD_REQUEST)
-        
+        try:
+            withdrawal_data = consume_intent(request.data.get('intent'), request.user, WITHDRAWAL_INTENT)
+        except IntentError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
         account_number = withdrawal_data.get('account_number')
         amount =  Decimal(withdrawal_data.get('amount'))
         try:
@@ -177,28 +183,18 @@ class VerifyUsernameAndWithdrawApiView(generics.CreateAPIView):
         except BankAccount.DoesNotExist:
             return Response({'error': 'Invalid account number'}, status=status.HTTP_404_NOT_FOUND)
         
-        if bank_account.account_balance < amount:
+        try:
+            transaction = post_withdrawal(bank_account.id, amount, user=request.user,
+                                          description=f'Withdrawal of {amount} from account {account_number}')
+        except InsufficientFundsError:
             return Response({'error': 'Insufficient funds for withdraw'}, status=status.HTTP_400_BAD_REQUEST)
-        bank_account.account_balance -= amount
-        bank_account.save()
-
-        transaction = Transaction.objects.create(
-            user=request.user,
-            sender=request.user,
-            sender_account=bank_account,
-            amount=amount,
-            description=f'Withdrawal of {amount} from account {account_number}',
-            transaction_type=Transaction.TransactionType.WITHDRAW,
-            transaction_status=Transaction.TransactionStatus.SUCCESS
-        )
+        bank_account = transaction.sender_account
         logger.info(f'Withdrawal of {amount} made from account {account_number} by user {request.user.email}')
 
         send_withdrawal_email(user=request.user, user_email=request.user.email, amount=amount, 
                               currency=bank_account.account_currency, new_balance=bank_account.account_balance, 
                               account_number=account_number)
-        
-        del request.session['withdrawal_data']
-        
+
         return Response({
             'message': f'Withdrawal of {amount} completed successfully',
             'transaction': TransactionSerializer(transaction).data,
@@ -229,16 +225,17 @@ class InitiateTransferView(generics.CreateAPIView):
 
         serializer = self.get_serializer(data=data)
         if serializer.is_valid():
-            request.session['transfer_data'] = {
+            intent = issue_intent(request.user, TRANSFER_INTENT, {
                 'sender_account': sender_account_number,
                 'receiver_account': receiver_account_number,
                 'amount': str(serializer.validated_data['amount']),
                 'description': serializer.validated_data.get('description', '')
-            }
-            logger.info('Transfer data is saved in session')
+            })
+            logger.info(f'Transfer intent issued for account {sender_account_number}')
             return Response({
                 'message': 'Transfer initiated successfully, Please answer the security question to complete the transfer',
-                'next_step': 'Verify security question'
+                'next_step': 'Verify security question',
+                'intent': intent
             }, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -264,6 +261,7 @@ class VerifyOTPAndTransferView(generics.CreateAPIView):
     renderer_classes = [GenericJSONRenderer]
     object_label = 'otp_verification'
 
+    @idempotent
     def create(self, request: Request, *args: Any, **kwargs: Any) -> Response:
         serializer = self.get_serializer(data=request.data, context={'request': request})
         if serializer.is_valid():
@@ -272,10 +270,10 @@ class VerifyOTPAndTransferView(generics.CreateAPIView):
     
     @transaction.atomic
     def process_transfer(self, request: Request) -> Response:
-        transfer_data = request.session.get('transfer_data', None)
-        if not transfer_data:
-            return Response({'error': 'No pending transfer data found. Please initiate a transfer data first'}, 
-                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            transfer_data = consume_intent(request.data.get('intent'), request.user, TRANSFER_INTENT)
+        except IntentError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         try:
             sender_account_number = transfer_data.get('sender_account')
             sender_account = BankAccount.objects.get(account_number=sender_account_number, user=request.user)
@@ -285,28 +283,14 @@ class VerifyOTPAndTransferView(generics.CreateAPIView):
             return Response({'error': 'Invalid account number'}, status=status.HTTP_404_NOT_FOUND)
         
         amount = Decimal(transfer_data.get('amount'))
-        if sender_account.account_balance < amount:
-            return Response({'error': 'Insufficient funds for transfer'}, status=status.HTTP_400_BAD_REQUEST)
-        
-        sender_account.account_balance -= amount
-        receiver_account.account_balance += amount
-        sender_account.save()
-        receiver_account.save()
-
         description = transfer_data.get('description', '')
-        transaction = Transaction.objects.create(
-            user=request.user,
-            sender=request.user,
-            sender_account=sender_account,
-            receiver=receiver_account.user,
-            receiver_account=receiver_account,
-            amount=amount,
-            description=description,
-            transaction_type=Transaction.TransactionType.TRANSFER,
-            transaction_status=Transaction.TransactionStatus.SUCCESS
-        )
-
-        del request.session['transfer_data']
+        try:
+            transaction = post_transfer(sender_account.id, receiver_account.id, amount, user=request.user,
+                                        description=description)
+        except InsufficientFundsError:
+            return Response({'error': 'Insufficient funds for transfer'}, status=status.HTTP_400_BAD_REQUEST)
+        sender_account = transaction.sender_account
+        receiver_account = transaction.receiver_account
 
         send_transfer_email(sender=request.user, sender_email=request.user.email, receiver=receiver_account.user,
                             receiver_email=receiver_account.user.email, amount=amount, 
@@ -323,44 +307,136 @@ class VerifyOTPAndTransferView(generics.CreateAPIView):
             'transaction': TransactionSerializer(transaction).data
         }, status=status.HTTP_200_OK)
 
+class InitiateBatchTransferView(generics.CreateAPIView):
+    serializer_class = BatchTransferSerializer
+    renderer_classes = [GenericJSONRenderer]
+    object_label = 'initiate_batch_transfer'
+
+    def create(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        sender_account_number = serializer.validated_data['sender_account']
+        items = serializer.validated_data['items']
+        try:
+            sender_bank_account = BankAccount.objects.get(account_number=sender_account_number, user=request.user)
+            if not (sender_bank_account.fully_activated and sender_bank_account.kyc_verified):
+                return Response({'error': 'Sender account isn\'t fully verified'}, status=status.HTTP_403_FORBIDDEN)
+        except BankAccount.DoesNotExist:
+            return Response({'error': 'Invalid account number'}, status=status.HTTP_404_NOT_FOUND)
+
+        intent = issue_intent(request.user, BATCH_TRANSFER_INTENT, {
+            'sender_account': sender_account_number,
+            'items': [{
+                'receiver_account': item['receiver_account'],
+                'amount': str(item['amount']),
+                'description': item['description'],
+            } for item in items]
+        })
+        logger.info(f'Batch transfer intent of {len(items)} items issued for account {sender_account_number}')
+        return Response({
+            'message': f'Batch transfer of {len(items)} items initiated successfully, Please answer the security ' + \
+                'question to complete the transfers',
+            'next_step': 'Verify security question',
+            'intent': intent
+        }, status=status.HTTP_200_OK)
+
+class VerifyOTPAndBatchTransferView(generics.CreateAPIView):
+    serializer_class = OTPVerificationSerializer
+    renderer_classes = [GenericJSONRenderer]
+    object_label = 'batch_transfer'
+
+    @idempotent
+    def create(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        serializer = self.get_serializer(data=request.data, context={'request': request})
+        if serializer.is_valid():
+            return self.process_batch_transfer(request)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    @transaction.atomic
+    def process_batch_transfer(self, request: Request) -> Response:
+        try:
+            batch_transfer_data = consume_intent(request.data.get('intent'), request.user, BATCH_TRANSFER_INTENT)
+        except IntentError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            sender_account_number = batch_transfer_data.get('sender_account')
+            sender_account = BankAccount.objects.get(account_number=sender_account_number, user=request.user)
+        except BankAccount.DoesNotExist:
+            return Response({'error': 'Invalid account number'}, status=status.HTTP_404_NOT_FOUND)
+
+        items = [{**item, 'amount': Decimal(item['amount'])} for item in batch_transfer_data['items']]
+        results = post_transfer_batch(sender_account.id, items, user=request.user)
+
+        succeeded = [result for result in results if result['status'] == Transaction.TransactionStatus.SUCCESS]
+        if succeeded:
+            transfers = Transaction.objects.filter(id__in=[result['transaction_id'] for result in succeeded]) \
+                .select_related('sender_account', 'receiver', 'receiver_account').prefetch_related('ledger_entries')
+            emails = []
+            for transfer in transfers:
+                balances = {entry.account_id: entry.balance_after for entry in transfer.ledger_entries.all()}
+                emails += transfer_emails(sender=request.user, sender_email=request.user.email,
+                                          receiver=transfer.receiver, receiver_email=transfer.receiver.email,
+                                          amount=transfer.amount, currency=transfer.sender_account.account_currency,
+                                          sender_new_balance=balances[transfer.sender_account_id],
+                                          receiver_new_balance=balances[transfer.receiver_account_id],
+                                          sender_account_number=sender_account_number,
+                                          receiver_account_number=transfer.receiver_account.account_number)
+            enqueue_emails(emails)
+        logger.info(f'Batch transfer of {len(succeeded)}/{len(results)} items made from account : ' + \
+                    f'{sender_account_number} by user {request.user.email}')
+
+        return Response({
+            'message': f'{len(succeeded)} of {len(results)} transfers completed successfully',
+            'results': results
+        }, status=status.HTTP_200_OK)
+
 class TransactionListApiView(generics.ListAPIView):
     serializer_class = TransactionSerializer
-    pagination_class = StandardResultsSetPagination
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend, OrderingFilter]
     ordering_fields = ['created_at', 'amount']
     ordering = ['-created_at']
 
+    @property
+    def paginator(self) -> Any:
+        if not hasattr(self, '_paginator'):
+            if 'page' in self.request.query_params:
+                self._paginator = StandardResultsSetPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
     def get_queryset(self) -> Any:
         user = self.request.user
-        queryset = Transaction.objects.filter(Q(sender=user) | Q(receiver=user))
-
         start_date = self.request.query_params.get('start_date', None)
         end_date = self.request.query_params.get('end_date', None)
         account_number = self.request.query_params.get('account_number', None)
 
-        if start_date:
-            try:
-                start_date = parser.parse(start_date)
-                queryset = queryset.filter(created_at__gte=start_date)
-            except ValueError:
-                pass
-        if end_date:
-            try:
-                end_date = parser.parse(end_date)
-                queryset = queryset.filter(created_at__lte=end_date)
-            except ValueError:
-                pass
+        account = None
         if account_number:
             try:
                 account = BankAccount.objects.get(account_number=account_number, user=user)
-                queryset = queryset.filter(Q(sender_account=account) | Q(receiver_account=account))
             except BankAccount.DoesNotExist:
-                queryset = Transaction.objects.none()
+                return Transaction.objects.none()
+
+        try:
+            start_date = parser.parse(start_date) if start_date else None
+        except ValueError:
+            start_date = None
+        try:
+            end_date = parser.parse(end_date) if end_date else None
+        except ValueError:
+            end_date = None
 
-        return queryset
+        return transaction_history(user, account, created_from=start_date, created_until=end_date)
     
     def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
-        response = super().list(request, *args, **kwargs)
+        queryset = project_transactions(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            response = self.get_paginated_response(transaction_feed(page))
+        else:
+            response = Response(transaction_feed(queryset))
         account_number = request.query_params.get('account_number', None)
         if account_number:
             logger.info(f'User {request.user.email} successfully retrieved transactions from account: {account_number}')
@@ -368,6 +444,42 @@ class TransactionListApiView(generics.ListAPIView):
             logger.info(f'User {request.user.email} successfully retrieved transactions from all accounts')
         return response
 
+class Echo:
+    def write(self, value: str) -> str:
+        return value
+
+class TransactionExportApiView(TransactionListApiView):
+    pagination_class = None
+    export_formats = {
+        'csv': 'text/csv',
+        'ndjson': 'application/x-ndjson',
+    }
+    chunk_size = 2000
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Any:
+        export_format = request.query_params.get('export_format', 'csv').lower()
+        if export_format not in self.export_formats:
+            return Response({'error': f'Unsupported export format, choose one of: {", ".join(self.export_formats)}'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = project_transactions(self.filter_queryset(self.get_queryset()))
+        rows = (transaction_row(row) for row in queryset.iterator(chunk_size=self.chunk_size))
+        if export_format == 'csv':
+            content = self.stream_csv(rows)
+        else:
+            content = (json.dumps(row) + '\n' for row in rows)
+
+        response = StreamingHttpResponse(content, content_type=self.export_formats[export_format])
+        response['Content-Disposition'] = f'attachment; filename="transactions.{export_format}"'
+        logger.info(f'User {request.user.email} started a {export_format} transactions export')
+        return response
+
+    def stream_csv(self, rows: Iterator[dict]) -> Iterator[str]:
+        writer = csv.writer(Echo())
+        yield writer.writerow(TRANSACTION_EXPORT_COLUMNS)
+        for row in rows:
+            yield writer.writerow([row[column] for column in TRANSACTION_EXPORT_COLUMNS])
+
 class TransactionPDFApiView(APIView):
     renderer_classes = [GenericJSONRenderer]
     object_label = 'transaction_pdf'
@@ -395,3 +507,99 @@ class TransactionPDFApiView(APIView):
             'message': 'Your transaction history PDF is being generated and will be sent to your email shortly',
             'email': user.email
         }, status=status.HTTP_202_ACCEPTED)
+
+
+class AccountAnalyticsApiView(APIView):
+    renderer_classes = [GenericJSONRenderer]
+    object_label = 'account_analytics'
+    max_months = 24
+
+    def get(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        account_number = request.query_params.get('account_number')
+        if not account_number:
+            return Response({'error': 'Account number is required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            account = BankAccount.objects.get(account_number=account_number, user=request.user)
+        except BankAccount.DoesNotExist:
+            return Response({'error': 'Invalid account number'}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            months = min(max(int(request.query_params.get('months', 12)), 1), self.max_months)
+        except ValueError:
+            return Response({'error': 'Months must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+        since = month_start(timezone.now().date())
+        for _ in range(months - 1):
+            since = month_start(since - timezone.timedelta(days=1))
+
+        logger.info(f'User {request.user.email} retrieved analytics for account {account_number}')
+        return Response(account_analytics(account, since), status=status.HTTP_200_OK)
+
+
+class BalanceAsOfApiView(APIView):
+    renderer_classes = [GenericJSONRenderer]
+    object_label = 'balance_as_of'
+
+    def get(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        account_number = request.query_params.get('account_number')
+        if not account_number:
+            return Response({'error': 'Account number is required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            account = BankAccount.objects.get(account_number=account_number, user=request.user)
+        except BankAccount.DoesNotExist:
+            return Response({'error': 'Invalid account number'}, status=status.HTTP_404_NOT_FOUND)
+
+        as_of = request.query_params.get('as_of')
+        try:
+            as_of = parser.parse(as_of) if as_of else timezone.now()
+        except (ValueError, OverflowError) as e:
+            return Response({'error': f'Invalid date format : {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
+        if timezone.is_naive(as_of):
+            as_of = timezone.make_aware(as_of)
+        as_of = min(as_of, timezone.now())
+
+        balance = balance_as_of(account.id, as_of)
+        logger.info(f'User {request.user.email} retrieved the balance of account {account_number} as of {as_of}')
+        return Response({
+            'account_number': account.account_number,
+            'account_currency': account.account_currency,
+            'as_of': as_of.isoformat(),
+            'balance': str(balance),
+        }, status=status.HTTP_200_OK)
+
+class AccountNumberBatchVerificationApiView(APIView):
+    renderer_classes = [GenericJSONRenderer]
+    object_label = 'account_numbers'
+    permission_classes = [IsTeller | IsAccountExecutive]
+
+    def post(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        serializer = AccountNumberBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        account_numbers = serializer.validated_data['account_numbers']
+
+        valid, currencies = validate_account_numbers(account_numbers)
+        valid_numbers = [number for number, is_valid in zip(account_numbers, valid) if is_valid]
+        accounts = {
+            account_number: (fully_activated, account_status)
+            for account_number, fully_activated, account_status in BankAccount.objects.filter(
+                account_number__in=valid_numbers).values_list('account_number', 'fully_activated', 'account_status')
+        }
+
+        results = []
+        for account_number, is_valid, currency in zip(account_numbers, valid, currencies):
+            fully_activated, account_status = accounts.get(account_number, (False, None))
+            results.append({
+                'account_number': account_number,
+                'valid': bool(is_valid),
+                'currency': currency,
+                'exists': account_number in accounts,
+                'fully_activated': fully_activated,
+                'account_status': account_status,
+            })
+        logger.info(f'User {request.user.email} verified {len(results)} account numbers, ' + \
+                    f'{len(valid_numbers)} valid and {len(accounts)} existing')
+        return Response({
+            'count': len(results),
+            'valid_count': len(valid_numbers),
+            'existing_count': len(accounts),
+            'results': results,
+        }, status=status.HTTP_200_OK)
@@ -1,30 +1,39 @@
 import hashlib
 import hmac
-import random
-import string
 from os import getenv
+from typing import List
+
+from django.conf import settings
+
+from core_apps.common.numbering import NumberPool, reserve_numbers
+
+from .models import VirtualCard
 
 BANK_CARD_PREFIX = getenv('BANK_CARD_PREFIX')
 BANK_CARD_CODE = getenv('BANK_CARD_CODE')
+CARD_NUMBER_LENGTH = 16
+
+def luhn_check_digit(number: str) -> int:
+    total = 0
+    for index, digit in enumerate(int(d) for d in reversed(number)):
+        if index % 2 == 0:
+            digit *= 2
+            if digit > 9:
+                digit -= 9
+        total += digit
+    return (10 - total % 10) % 10
 
-def generate_card_number(prefix=BANK_CARD_PREFIX, card_code=BANK_CARD_CODE, length=16) -> str:
-    total_prefix = prefix + card_code
-    random_digits_length = length - len(total_prefix) - 1
+def reserve_card_numbers(prefix: str, count: int) -> List[str]:
+    return reserve_numbers(prefix, count, CARD_NUMBER_LENGTH, luhn_check_digit,
+                           getenv('CARD_NUMBER_SECRET_KEY').encode('utf8'), VirtualCard.objects.all(), 'card_number')
 
-    if random_digits_length < 0:
-        raise ValueError('Prefix and code are too long for card_number generation')
+card_numbers = NumberPool(reserve_card_numbers, settings.CARD_NUMBER_BLOCK_SIZE)
 
-    random_digits = ''.join(random.choices(string.digits, k=random_digits_length))
-    card_number = total_prefix + random_digits
+def generate_card_numbers(count: int, prefix=BANK_CARD_PREFIX, card_code=BANK_CARD_CODE) -> List[str]:
+    return card_numbers.take(prefix + card_code, count)
 
-    digits = [int(d) for d in random_digits]
-    for i in range(len(digits)-1, -1, -2):
-        digits[i] *= 2
-        if digits[i] > 9:
-            digits[i] -= 9
-    
-    check_digit = (10 - sum(digits) % 10) % 10
-    return card_number + str(check_digit)
+def generate_card_number(prefix=BANK_CARD_PREFIX, card_code=BANK_CARD_CODE) -> str:
+    return generate_card_numbers(1, prefix, card_code)[0]
 
 def generate_card_cvv(card_number: str, expiry_date: str) -> str:
     secret_key = getenv('CVV_SECRET_KEY').encode('utf8')
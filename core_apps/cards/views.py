@@ -8,7 +8,8 @@ from rest_framework.exceptions import PermissionDenied
 from rest_framework.request import Request
 from rest_framework.response import Response
 
-from core_apps.accounts.models import Transaction
+from core_apps.accounts.posting import InsufficientFundsError, post_card_topup
+from core_apps.common.idempotency import idempotent
 from core_apps.common.renderers import GenericJSONRenderer
 
 from .emails import send_virtual_card_topup_email
@@ -92,6 +93,7 @@ class VirtualCardTopupApiView(generics.UpdateAPIView):
     def get_queryset(self):
         return VirtualCard.objects.filter(user=self.request.user)
     
+    @idempotent
     @transaction.atomic
     def update(self, request: Request, *args: Any, **kwargs: Any) -> Response:
         virtual_card = self.get_object()
@@ -113,29 +115,15 @@ class VirtualCardTopupApiView(generics.UpdateAPIView):
                 'error': 'Top-up amount must be greater than zero.'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        bank_account = virtual_card.account
-        if bank_account.account_balance < amount:
+        try:
+            topup = post_card_topup(virtual_card, amount, user=request.user,
+                                    description=f'Top-up for Visa Card ending in {virtual_card.card_number[-4:]}')
+        except InsufficientFundsError:
             return Response({
                 'error': 'Insufficient funds for top-up.'
             }, status=status.HTTP_400_BAD_REQUEST)
+        bank_account = topup.sender_account
 
-        bank_account.account_balance -= amount
-        virtual_card.balance += amount
-        bank_account.save()
-        virtual_card.save()
-
-        Transaction.objects.create(
-            user=request.user,
-            amount=amount,
-            description=f'Top-up for Visa Card ending in {virtual_card.card_number[-4:]}',
-            transaction_type=Transaction.TransactionType.DEPOSIT,
-            transaction_status=Transaction.TransactionStatus.SUCCESS,
-            sender=request.user,
-            receiver=request.user,
-            sender_account=bank_account,
-            receiver_account=bank_account
-        )
-        
         send_virtual_card_topup_email(request.user, virtual_card.card_number, amount, bank_account.account_currency,
                                        virtual_card.balance)
         logger.info(f'Top-up of {amount} to virtual card number {virtual_card.card_number} ' + \
@@ -4,7 +4,7 @@ from django.contrib.contenttypes.admin import GenericTabularInline
 from django.http import HttpRequest
 from django.utils.translation import gettext_lazy as _
 
-from .models import ContentView
+from .models import ContentView, OutboxEmail
 
 @admin.register(ContentView)
 class ContentViewAdmin(admin.ModelAdmin):
@@ -25,6 +25,21 @@ class ContentViewAdmin(admin.ModelAdmin):
     def has_change_permission(self, request: HttpRequest, obj: Any = None) -> bool:
         return False
     
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('template', 'recipient', 'status', 'attempts', 'available_at', 'sent_at', 'created_at')
+    list_filter = ('status', 'template', 'created_at')
+    search_fields = ('recipient',)
+    fields = ('template', 'subject', 'recipient', 'status', 'attempts', 'available_at', 'sent_at', 'last_error',
+              'created_at', 'updated_at')
+    readonly_fields = fields
+
+    def has_add_permission(self, request: HttpRequest) -> bool:
+        return False
+
+    def has_change_permission(self, request: HttpRequest, obj: Any = None) -> bool:
+        return False
+
 class ContentViewInline(GenericTabularInline):
     model = ContentView
     extra = 0
@@ -0,0 +1,44 @@
+import os
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import Template
+from django.template.loader import get_template
+from django.utils.html import strip_tags
+
+EmailTemplates = Tuple[Template, Optional[Template]]
+
+def load_email_templates(template_name: str) -> EmailTemplates:
+    try:
+        text_template = get_template(f'{os.path.splitext(template_name)[0]}.txt')
+    except TemplateDoesNotExist:
+        text_template = None
+    return get_template(template_name), text_template
+
+@lru_cache(maxsize=None)
+def compiled_email_templates(template_name: str) -> EmailTemplates:
+    return load_email_templates(template_name)
+
+def email_templates(template_name: str) -> EmailTemplates:
+    """
+    Return the compiled HTML template and its plain-text ``.txt`` variant, if
+    any. Outside DEBUG both are compiled once per process and reused for every
+    email, skipping the loader lookup.
+    """
+    return load_email_templates(template_name) if settings.DEBUG else compiled_email_templates(template_name)
+
+def render_email(template_name: str, context: Dict[str, Any]) -> Tuple[str, str]:
+    html_template, text_template = email_templates(template_name)
+    html_content = html_template.render(context)
+    text_content = text_template.render(context) if text_template else strip_tags(html_content)
+    return text_content, html_content
+
+def build_email(subject: str, template_name: str, context: Dict[str, Any],
+                recipient_list: List[str]) -> EmailMultiAlternatives:
+    text_content, html_content = render_email(template_name, context)
+    msg = EmailMultiAlternatives(str(subject), text_content, settings.DEFAULT_FROM_EMAIL, recipient_list)
+    msg.attach_alternative(html_content, 'text/html')
+    return msg
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import time
+from functools import wraps
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError
+from django.utils import timezone
+from loguru import logger
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+
+class IdempotencyStore:
+    """
+    Stores the first response for an idempotency key in the cache (Redis),
+    falling back to the ``IdempotencyKey`` table whenever the cache is
+    unreachable.
+    """
+    def __init__(self) -> None:
+        self.cache = caches[settings.IDEMPOTENCY_CACHE]
+        self.ttl = settings.IDEMPOTENCY_KEY_TTL
+        self.lock_timeout = settings.IDEMPOTENCY_LOCK_TIMEOUT
+
+    def acquire(self, key: str, fingerprint: str) -> bool:
+        try:
+            return self.cache.add(f'{key}:lock', fingerprint, timeout=self.lock_timeout.total_seconds())
+        except Exception as e:
+            logger.warning(f'Idempotency cache unavailable, falling back to database: {e}')
+        IdempotencyKey.objects.filter(key=key, expires_at__lte=timezone.now()).delete()
+        try:
+            IdempotencyKey.objects.create(key=key, fingerprint=fingerprint, expires_at=timezone.now() + self.ttl)
+            return True
+        except IntegrityError:
+            return False
+
+    def get(self, key: str) -> Optional[dict]:
+        try:
+            stored = self.cache.get(f'{key}:response')
+            if stored is not None:
+                return stored
+            fingerprint = self.cache.get(f'{key}:lock')
+            return {'fingerprint': fingerprint, 'status': None} if fingerprint else None
+        except Exception as e:
+            logger.warning(f'Idempotency cache unavailable, falling back to database: {e}')
+        record = IdempotencyKey.objects.filter(key=key, expires_at__gt=timezone.now()).first()
+        if record is None:
+            return None
+        return {'fingerprint': record.fingerprint, 'status': record.response_status, 'data': record.response_data}
+
+    def save(self, key: str, fingerprint: str, response: Response) -> None:
+        stored = {
+            'fingerprint': fingerprint,
+            'status': response.status_code,
+            'data': json.loads(json.dumps(response.data, cls=JSONEncoder)),
+        }
+        try:
+            self.cache.set(f'{key}:response', stored, timeout=self.ttl.total_seconds())
+            return
+        except Exception as e:
+            logger.warning(f'Idempotency cache unavailable, falling back to database: {e}')
+        IdempotencyKey.objects.update_or_create(key=key, defaults={
+            'fingerprint': fingerprint,
+            'response_status': stored['status'],
+            'response_data': stored['data'],
+            'expires_at': timezone.now() + self.ttl,
+        })
+
+    def release(self, key: str) -> None:
+        try:
+            self.cache.delete(f'{key}:lock')
+            return
+        except Exception as e:
+            logger.warning(f'Idempotency cache unavailable, falling back to database: {e}')
+        IdempotencyKey.objects.filter(key=key, response_status__isnull=True).delete()
+
+def request_fingerprint(request: Request) -> str:
+    payload = json.dumps(request.data, cls=JSONEncoder, sort_keys=True)
+    return hashlib.sha256(f'{request.method}:{request.path}:{payload}'.encode('utf8')).hexdigest()
+
+def replay(stored: dict) -> Response:
+    response = Response(stored['data'], status=stored['status'])
+    response[REPLAYED_HEADER] = 'true'
+    return response
+
+def idempotent(handler: Callable) -> Callable:
+    """
+    Make a money-movement view handler safe to retry. When the request carries
+    an ``Idempotency-Key`` header, the first non-5xx response is stored for
+    ``IDEMPOTENCY_KEY_TTL`` and replayed to later requests with the same key,
+    without running the handler again. A duplicate that arrives while the
+    first request is still running waits for its response.
+    """
+    @wraps(handler)
+    def wrapper(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        idempotency_key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not idempotency_key:
+            return handler(self, request, *args, **kwargs)
+
+        store = IdempotencyStore()
+        key = f'idempotency:{request.user.pk}:{self.__class__.__name__}:{idempotency_key}'
+        fingerprint = request_fingerprint(request)
+
+        deadline = time.monotonic() + store.lock_timeout.total_seconds()
+        while True:
+            stored = store.get(key)
+            if stored and stored['fingerprint'] != fingerprint:
+                return Response({'error': 'Idempotency-Key was already used with a different request'},
+                                status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+            if stored and stored['status'] is not None:
+                logger.info(f'Replaying stored response for idempotency key {idempotency_key}')
+                return replay(stored)
+            if not stored and store.acquire(key, fingerprint):
+                break
+            if time.monotonic() >= deadline:
+                return Response({'error': 'A request with this Idempotency-Key is still being processed'},
+                                status=status.HTTP_409_CONFLICT)
+            time.sleep(settings.IDEMPOTENCY_POLL_INTERVAL)
+
+        try:
+            response = handler(self, request, *args, **kwargs)
+        except Exception:
+            store.release(key)
+            raise
+        if response.status_code >= 500:
+            store.release(key)
+        else:
+            store.save(key, fingerprint, response)
+        return response
+    return wrapper
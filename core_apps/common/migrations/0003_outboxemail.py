@@ -0,0 +1,93 @@
+import core_apps.common.models
+from django.db import migrations, models
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0002_idempotencykey"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OutboxEmail",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "template",
+                    models.CharField(max_length=100, verbose_name="Template"),
+                ),
+                (
+                    "subject",
+                    models.CharField(max_length=255, verbose_name="Subject"),
+                ),
+                (
+                    "recipient",
+                    models.EmailField(max_length=254, verbose_name="Recipient"),
+                ),
+                (
+                    "context",
+                    models.JSONField(
+                        decoder=core_apps.common.models.OutboxContextDecoder,
+                        default=dict,
+                        encoder=core_apps.common.models.OutboxContextEncoder,
+                        verbose_name="Context",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("sent", "Sent"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                        verbose_name="Status",
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveSmallIntegerField(default=0, verbose_name="Attempts"),
+                ),
+                (
+                    "available_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="Available At"
+                    ),
+                ),
+                (
+                    "sent_at",
+                    models.DateTimeField(blank=True, null=True, verbose_name="Sent At"),
+                ),
+                (
+                    "last_error",
+                    models.TextField(blank=True, verbose_name="Last Error"),
+                ),
+            ],
+            options={
+                "verbose_name": "Outbox Email",
+                "verbose_name_plural": "Outbox Emails",
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("status", "pending")),
+                        fields=["available_at"],
+                        name="pending_outbox_email_idx",
+                    )
+                ],
+            },
+        ),
+    ]
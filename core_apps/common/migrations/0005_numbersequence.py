@@ -0,0 +1,40 @@
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0004_outboxemail_digestible"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NumberSequence",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "key",
+                    models.CharField(max_length=50, unique=True, verbose_name="Key"),
+                ),
+                (
+                    "next_value",
+                    models.PositiveBigIntegerField(default=0, verbose_name="Next Value"),
+                ),
+            ],
+            options={
+                "verbose_name": "Number Sequence",
+                "verbose_name_plural": "Number Sequences",
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations
+
+
+def strip_security_answers(apps, schema_editor):
+    OutboxEmail = apps.get_model("common", "OutboxEmail")
+    emails = []
+    for email in OutboxEmail.objects.filter(template="emails/account_created.html").iterator():
+        user = email.context.get("user") or {}
+        if "security_answer" in user:
+            del user["security_answer"]
+            emails.append(email)
+    OutboxEmail.objects.bulk_update(emails, ["context"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0005_numbersequence"),
+    ]
+
+    operations = [
+        migrations.RunPython(strip_security_answers, migrations.RunPython.noop),
+    ]
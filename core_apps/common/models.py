@@ -1,8 +1,11 @@
+import json
 import uuid
+from decimal import Decimal
 from typing import Any, Optional
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import IntegrityError, models
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
@@ -58,3 +61,77 @@ class ContentView(TimeStampedModel):
                 view.save()
         except IntegrityError:
             pass
+
+
+class IdempotencyKey(TimeStampedModel):
+    key = models.CharField(_('Key'), max_length=255, unique=True)
+    fingerprint = models.CharField(_('Request Fingerprint'), max_length=64)
+    response_status = models.PositiveSmallIntegerField(_('Response Status'), null=True, blank=True)
+    response_data = models.JSONField(_('Response Data'), null=True, blank=True)
+    expires_at = models.DateTimeField(_('Expires At'), db_index=True)
+
+    class Meta:
+        verbose_name = _('Idempotency Key')
+        verbose_name_plural = _('Idempotency Keys')
+
+    def __str__(self) -> str:
+        return f'{self.key} - {self.response_status or "in-flight"}'
+
+class OutboxContextEncoder(DjangoJSONEncoder):
+    """
+    Keeps ``Decimal`` values tagged in the stored template context, so amounts
+    are rendered from the outbox exactly as they would be from the request.
+    """
+    def default(self, o: Any) -> Any:
+        if isinstance(o, Decimal):
+            return {'__decimal__': str(o)}
+        return super().default(o)
+
+class OutboxContextDecoder(json.JSONDecoder):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, object_hook=self.decode_decimal, **kwargs)
+
+    @staticmethod
+    def decode_decimal(obj: dict) -> Any:
+        return Decimal(obj['__decimal__']) if obj.keys() == {'__decimal__'} else obj
+
+class OutboxEmail(TimeStampedModel):
+    class OutboxStatus(models.TextChoices):
+        PENDING = 'pending', _('Pending')
+        SENT = 'sent', _('Sent')
+        FAILED = 'failed', _('Failed')
+
+    template = models.CharField(_('Template'), max_length=100)
+    subject = models.CharField(_('Subject'), max_length=255)
+    recipient = models.EmailField(_('Recipient'))
+    context = models.JSONField(_('Context'), default=dict, encoder=OutboxContextEncoder,
+                               decoder=OutboxContextDecoder)
+    digestible = models.BooleanField(_('Digestible'), default=False)
+    status = models.CharField(_('Status'), max_length=10, choices=OutboxStatus.choices,
+                              default=OutboxStatus.PENDING)
+    attempts = models.PositiveSmallIntegerField(_('Attempts'), default=0)
+    available_at = models.DateTimeField(_('Available At'), default=timezone.now)
+    sent_at = models.DateTimeField(_('Sent At'), null=True, blank=True)
+    last_error = models.TextField(_('Last Error'), blank=True)
+
+    class Meta:
+        verbose_name = _('Outbox Email')
+        verbose_name_plural = _('Outbox Emails')
+        indexes = [
+            models.Index(fields=['available_at'], condition=models.Q(status='pending'),
+                         name='pending_outbox_email_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.template} to {self.recipient} - {self.status}'
+
+class NumberSequence(TimeStampedModel):
+    key = models.CharField(_('Key'), max_length=50, unique=True)
+    next_value = models.PositiveBigIntegerField(_('Next Value'), default=0)
+
+    class Meta:
+        verbose_name = _('Number Sequence')
+        verbose_name_plural = _('Number Sequences')
+
+    def __str__(self) -> str:
+        return f'{self.key} - {self.next_value}'
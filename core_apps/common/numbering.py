@@ -0,0 +1,97 @@
+import hashlib
+import hmac
+import threading
+from collections import defaultdict, deque
+from functools import partial
+from typing import Callable, Deque, Dict, List
+
+from django.db import transaction
+from django.db.models import QuerySet
+
+from .models import NumberSequence
+
+FEISTEL_ROUNDS = 8
+
+def reserve_serials(key: str, count: int, limit: int) -> range:
+    """
+    Reserve the next ``count`` serials of the ``key`` sequence, below
+    ``limit``. The sequence row stays locked until the caller's transaction
+    commits, so concurrent workers always get disjoint ranges, and a rolled
+    back reservation is handed out again rather than lost.
+    """
+    with transaction.atomic():
+        sequence, _ = NumberSequence.objects.select_for_update().get_or_create(key=key)
+        first = sequence.next_value
+        if first + count > limit:
+            raise ValueError(f'Number sequence {key} is exhausted')
+        sequence.next_value = first + count
+        sequence.save(update_fields=['next_value', 'updated_at'])
+    return range(first, first + count)
+
+def feistel_permute(value: int, domain: int, key: bytes) -> int:
+    """
+    Map ``value`` in ``[0, domain)`` to a unique value in the same range with
+    a keyed Feistel network over the smallest even bit width covering the
+    domain, cycle walking any result that falls outside it.
+    """
+    half_bits = -(-max(domain - 1, 1).bit_length() // 2)
+    mask = (1 << half_bits) - 1
+    while True:
+        left, right = value >> half_bits, value & mask
+        for round_number in range(FEISTEL_ROUNDS):
+            digest = hmac.new(key, f'{round_number}:{right}'.encode('utf8'), hashlib.sha256).digest()
+            left, right = right, left ^ (int.from_bytes(digest[:8], 'big') & mask)
+        value = (left << half_bits) | right
+        if value < domain:
+            return value
+
+def reserve_numbers(prefix: str, count: int, length: int, check_digit: Callable[[str], int], key: bytes,
+                    queryset: QuerySet, field: str) -> List[str]:
+    """
+    Reserve the next ``count`` serials of the ``field`` sequence under
+    ``prefix`` and return them as ``length`` digit numbers ending in
+    ``check_digit``. Serials are permuted with ``feistel_permute`` so the
+    numbers can't be enumerated from one another. Numbers already taken in
+    ``queryset`` by records created before this allocation are left out.
+    """
+    serial_digits = length - len(prefix) - 1
+    if serial_digits < 1:
+        raise ValueError(f'Prefix {prefix} is too long for a {length} digit {field}')
+
+    domain = 10 ** serial_digits
+    numbers = []
+    for serial in reserve_serials(f'{field}:{prefix}', count, domain):
+        partial_number = f'{prefix}{feistel_permute(serial, domain, key):0{serial_digits}d}'
+        numbers.append(f'{partial_number}{check_digit(partial_number)}')
+    taken = set(queryset.filter(**{f'{field}__in': numbers}).values_list(field, flat=True))
+    return [number for number in numbers if number not in taken]
+
+class NumberPool:
+    """
+    Hands out numbers from blocks reserved ahead of time by ``reserve``, so
+    only one in ``block_size`` numbers costs a database round trip. Numbers
+    left over from a block join the pool only once the transaction that
+    reserved them commits; if it rolls back the reservation is undone and
+    they are dropped with it.
+    """
+    def __init__(self, reserve: Callable[[str, int], List[str]], block_size: int) -> None:
+        self.reserve = reserve
+        self.block_size = block_size
+        self.lock = threading.Lock()
+        self.numbers: Dict[str, Deque[str]] = defaultdict(deque)
+
+    def take(self, key: str, count: int = 1) -> List[str]:
+        with self.lock:
+            pooled = self.numbers[key]
+            taken = [pooled.popleft() for _ in range(min(count, len(pooled)))]
+        while len(taken) < count:
+            needed = count - len(taken)
+            reserved = self.reserve(key, max(self.block_size, needed))
+            taken += reserved[:needed]
+            if len(reserved) > needed:
+                transaction.on_commit(partial(self.release, key, reserved[needed:]))
+        return taken
+
+    def release(self, key: str, numbers: List[str]) -> None:
+        with self.lock:
+            self.numbers[key].extend(numbers)
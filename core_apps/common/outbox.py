@@ -0,0 +1,141 @@
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+from functools import partial
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from loguru import logger
+
+from .emails import build_email
+from .models import OutboxEmail
+
+DIGEST_TEMPLATE = 'emails/notification_digest.html'
+
+def outbox_email(template: str, subject: str, recipient: str, context: Dict[str, Any],
+                 digestible: bool = False) -> OutboxEmail:
+    return OutboxEmail(template=template, subject=str(subject), recipient=recipient,
+                       context={**context, 'site_name': settings.SITE_NAME}, digestible=digestible)
+
+def enqueue_emails(emails: List[OutboxEmail]) -> None:
+    """
+    Write ``emails`` to the outbox in the caller's database transaction, so a
+    notification is sent if and only if the operation it reports commits. The
+    relay is nudged once the transaction commits; the periodic relay picks up
+    anything the nudge misses.
+    """
+    OutboxEmail.objects.bulk_create(emails)
+    transaction.on_commit(nudge_relay)
+
+def purge_sent_emails(retention) -> int:
+    """
+    Delete outbox emails sent more than ``retention`` ago. Their context holds
+    customer details that are only needed until the email is delivered.
+    """
+    deleted, _ = OutboxEmail.objects.filter(status=OutboxEmail.OutboxStatus.SENT,
+                                            sent_at__lt=timezone.now() - retention).delete()
+    return deleted
+
+def nudge_relay() -> None:
+    from .tasks import relay_outbox
+
+    try:
+        relay_outbox.delay()
+    except Exception as e:
+        logger.warning(f'Failed to queue outbox relay, emails will be sent on the next scheduled run: {e}')
+
+def render_outbox_email(email: OutboxEmail) -> EmailMultiAlternatives:
+    return build_email(email.subject, email.template, email.context, [email.recipient])
+
+def render_digest_email(recipient: str, emails: List[OutboxEmail]) -> EmailMultiAlternatives:
+    notifications = [{**email.context, 'subject': email.subject, 'created_at': email.created_at}
+                     for email in sorted(emails, key=lambda email: email.created_at)]
+    context = {
+        'user': notifications[-1].get('user'),
+        'notifications': notifications,
+        'site_name': settings.SITE_NAME,
+    }
+    return build_email(_('Your account activity summary'), DIGEST_TEMPLATE, context, [recipient])
+
+def digest_window_end(moment: datetime) -> datetime:
+    """
+    End of the ``OUTBOX_DIGEST_WINDOW`` that ``moment`` falls in. Windows are
+    aligned to the epoch so every notification of a window shares one end.
+    """
+    window = settings.OUTBOX_DIGEST_WINDOW.total_seconds()
+    return datetime.fromtimestamp((moment.timestamp() // window + 1) * window, tz=dt_timezone.utc)
+
+def digest_subscribers(recipients: Set[str]) -> Set[str]:
+    if not recipients:
+        return set()
+    return set(get_user_model().objects.filter(email__in=recipients, profile__notification_digest=True)
+               .values_list('email', flat=True))
+
+@transaction.atomic
+def relay_outbox_batch(batch_size: int) -> Tuple[int, int, int]:
+    """
+    Render and send up to ``batch_size`` due outbox emails over a single
+    connection. Rows are claimed with ``SKIP LOCKED`` so concurrent relays
+    never send the same email twice. Digestible emails of users who opted in
+    to digests are held until their window closes and then merged into one
+    email. A failed email is retried with exponential backoff until
+    ``OUTBOX_MAX_ATTEMPTS`` is reached. If the email backend cannot be reached
+    the batch is rolled back and left pending. Returns the number of outbox
+    emails claimed, sent and failed.
+    """
+    now = timezone.now()
+    emails = list(OutboxEmail.objects.select_for_update(skip_locked=True).filter(
+        status=OutboxEmail.OutboxStatus.PENDING, available_at__lte=now).order_by('available_at')[:batch_size])
+    subscribers = digest_subscribers({email.recipient for email in emails if email.digestible})
+
+    deliveries: List[Tuple[List[OutboxEmail], Callable[[], EmailMultiAlternatives]]] = []
+    digests = defaultdict(list)
+    for email in emails:
+        if email.digestible and email.recipient in subscribers:
+            digests[email.recipient].append(email)
+        else:
+            deliveries.append(([email], partial(render_outbox_email, email)))
+    for recipient, digest in digests.items():
+        window_end = digest_window_end(min(email.created_at for email in digest))
+        if window_end > now:
+            for email in digest:
+                email.available_at = window_end
+                email.updated_at = now
+        else:
+            deliveries.append((digest, partial(render_digest_email, recipient, digest)))
+
+    sent, failed = 0, 0
+    if not deliveries:
+        OutboxEmail.objects.bulk_update(emails, ['available_at', 'updated_at'])
+        return len(emails), sent, failed
+    with get_connection(settings.OUTBOX_EMAIL_BACKEND) as connection:
+        for rows, render in deliveries:
+            sent_at = timezone.now()
+            try:
+                connection.send_messages([render()])
+                error = None
+            except Exception as e:
+                logger.error(f'Failed to send {rows[0].template} email to {rows[0].recipient}, Error: {e}')
+                error = str(e)
+            for email in rows:
+                email.attempts += 1
+                email.updated_at = sent_at
+                if error is None:
+                    email.status = OutboxEmail.OutboxStatus.SENT
+                    email.sent_at = sent_at
+                    email.last_error = ''
+                    sent += 1
+                else:
+                    email.last_error = error
+                    if email.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                        email.status = OutboxEmail.OutboxStatus.FAILED
+                    else:
+                        email.available_at = now + settings.OUTBOX_RETRY_BACKOFF * 2 ** (email.attempts - 1)
+                    failed += 1
+    OutboxEmail.objects.bulk_update(emails, ['status', 'attempts', 'available_at', 'sent_at', 'last_error',
+                                             'updated_at'])
+    return len(emails), sent, failed
@@ -1,6 +1,131 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import binascii
+import json
+from typing import Any, List, Optional
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q, QuerySet
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 class StandardResultsSetPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 100
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on ``(ordering field, id)``. Each page is a single
+    range query on the ordering index, so latency does not grow with history
+    depth and no ``COUNT(*)`` is run. Cursors are opaque base64 tokens.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    ordering_fields = ('created_at', 'amount')
+    default_ordering = '-created_at'
+
+    def paginate_queryset(self, queryset: QuerySet, request: Request, view: Any = None) -> List[Any]:
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        ordering = self.get_ordering(queryset)
+        self.field = ordering.lstrip('-')
+        cursor = self.decode_cursor(request, queryset)
+        reverse = bool(cursor and cursor['reverse'])
+        descending = ordering.startswith('-') != reverse
+
+        direction = '-' if descending else ''
+        queryset = queryset.order_by(f'{direction}{self.field}', f'{direction}id')
+        if cursor:
+            lookup = 'lt' if descending else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{self.field}__{lookup}': cursor['value']}) |
+                Q(**{self.field: cursor['value'], f'id__{lookup}': cursor['id']})
+            )
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data: Any) -> Response:
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request: Request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def get_ordering(self, queryset: QuerySet) -> str:
+        ordering = queryset.query.order_by[0] if queryset.query.order_by else self.default_ordering
+        if isinstance(ordering, str) and ordering.lstrip('-') in self.ordering_fields:
+            return ordering
+        return self.default_ordering
+
+    def get_next_link(self) -> Optional[str]:
+        if not (self.has_next and self.page):
+            return None
+        return self.build_link(self.page[-1], reverse=False)
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.build_link(self.page[0], reverse=True)
+
+    def build_link(self, row: Any, reverse: bool) -> str:
+        value = row[self.field] if isinstance(row, dict) else getattr(row, self.field)
+        row_id = row['id'] if isinstance(row, dict) else row.id
+        payload = {
+            'value': value.isoformat() if hasattr(value, 'isoformat') else str(value),
+            'id': str(row_id),
+            'reverse': reverse,
+        }
+        cursor = base64.urlsafe_b64encode(json.dumps(payload).encode('utf8')).decode('ascii')
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request: Request, queryset: QuerySet) -> Optional[dict]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        opts = queryset.model._meta
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf8'))
+            value = opts.get_field(self.field).to_python(cursor['value'])
+            row_id = opts.pk.to_python(cursor['id'])
+            if value is None or row_id is None:
+                raise ValueError('Incomplete cursor')
+            return {'value': value, 'id': row_id, 'reverse': bool(cursor['reverse'])}
+        except (binascii.Error, ValueError, KeyError, TypeError, UnicodeError, ValidationError):
+            raise NotFound(_('Invalid cursor'))
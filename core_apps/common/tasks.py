@@ -0,0 +1,30 @@
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+from loguru import logger
+
+from .models import IdempotencyKey
+from .outbox import purge_sent_emails, relay_outbox_batch
+
+@shared_task
+def relay_outbox() -> str:
+    sent, failed = 0, 0
+    while True:
+        claimed, batch_sent, batch_failed = relay_outbox_batch(settings.OUTBOX_BATCH_SIZE)
+        sent += batch_sent
+        failed += batch_failed
+        if claimed < settings.OUTBOX_BATCH_SIZE:
+            break
+    if sent or failed:
+        logger.info(f'Outbox relay sent {sent} emails, {failed} failed')
+    return f'Sent {sent} outbox emails, {failed} failed'
+
+@shared_task
+def purge_sent_outbox_emails() -> str:
+    deleted = purge_sent_emails(settings.OUTBOX_SENT_RETENTION)
+    return f'Deleted {deleted} sent outbox emails'
+
+@shared_task
+def purge_expired_idempotency_keys() -> str:
+    deleted, _ = IdempotencyKey.objects.filter(expires_at__lte=timezone.now()).delete()
+    return f'Deleted {deleted} expired idempotency keys'
@@ -50,13 +50,13 @@ class User(AbstractUser):
     def set_otp(self, otp: str) -> None:
         self.otp = otp
         self.otp_expiry_time = timezone.now() + settings.OTP_EXPIRATION
-        self.save()
+        self.save(update_fields=['otp', 'otp_expiry_time'])
 
     def verify_otp(self, otp: str) -> bool:
         if self.otp == otp and self.otp_expiry_time > timezone.now():
             self.otp = ''
             self.otp_expiry_time = None
-            self.save()
+            self.save(update_fields=['otp', 'otp_expiry_time'])
             return True
         return False
     
@@ -65,16 +65,16 @@ class User(AbstractUser):
         self.last_failed_login = timezone.now()
         if self.failed_login_attempts >= settings.LOGIN_ATTEMPTS:
             self.account_status = User.AccountStatus.LOCKED
-            self.save()
+            self.save(update_fields=['failed_login_attempts', 'last_failed_login', 'account_status'])
             send_account_locked_email(self)
         else:
-            self.save()
+            self.save(update_fields=['failed_login_attempts', 'last_failed_login'])
 
     def reset_failed_login_attempts(self) -> None:
         self.failed_login_attempts = 0
         self.last_failed_login = None
         self.account_status = User.AccountStatus.ACTIVE
-        self.save()
+        self.save(update_fields=['failed_login_attempts', 'last_failed_login', 'account_status'])
 
     def unlock_account(self) -> None:
         if self.account_status == User.AccountStatus.LOCKED:
@@ -91,8 +91,11 @@ class User(AbstractUser):
     
     @property
     def full_name(self) -> str:
-        full_name = f'{self.first_name} {self.middle_name} {self.last_name}' if self.middle_name \
-            else f'{self.first_name} {self.last_name}'
+        return User.compose_full_name(self.first_name, self.middle_name, self.last_name)
+
+    @staticmethod
+    def compose_full_name(first_name: str, middle_name: str, last_name: str) -> str:
+        full_name = f'{first_name} {middle_name} {last_name}' if middle_name else f'{first_name} {last_name}'
         return full_name.title().strip()
 
     class Meta:
@@ -0,0 +1,62 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core_apps.user_profile.models import UserProfile
+
+User = get_user_model()
+
+PASSWORD = 'Str0ng-Passw0rd!'
+
+class AuthHotPathQueryCountTests(TestCase):
+    """
+    The login and OTP paths must write only the columns they change and must
+    not cascade into a ``UserProfile`` save (and its ``full_clean``).
+    """
+    def setUp(self) -> None:
+        self.user = User.objects.create_user(
+            email='jane.doe@example.com', password=PASSWORD, first_name='Jane', last_name='Doe', id_no=12345678,
+            security_question=User.SecurityQuestions.BIRTH_CITY, security_answer='Cairo',
+        )
+        self.client = APIClient()
+
+    def assert_profile_untouched(self, queries: CaptureQueriesContext) -> None:
+        profile_table = UserProfile._meta.db_table
+        touched = [query['sql'] for query in queries.captured_queries if profile_table in query['sql']]
+        self.assertEqual(touched, [], 'The user profile was queried or saved on an auth hot path')
+
+    def test_set_otp_writes_one_update(self) -> None:
+        with self.assertNumQueries(1), CaptureQueriesContext(connection) as queries:
+            self.user.set_otp('123456')
+        self.assert_profile_untouched(queries)
+
+    def test_verify_otp_writes_one_update(self) -> None:
+        self.user.set_otp('123456')
+        with self.assertNumQueries(1), CaptureQueriesContext(connection) as queries:
+            self.assertTrue(self.user.verify_otp('123456'))
+        self.assert_profile_untouched(queries)
+
+    def test_failed_login_attempt_writes_one_update(self) -> None:
+        with self.assertNumQueries(1), CaptureQueriesContext(connection) as queries:
+            self.user.handle_failed_login_attempts()
+        self.assert_profile_untouched(queries)
+
+    def test_reset_failed_login_attempts_writes_one_update(self) -> None:
+        with self.assertNumQueries(1), CaptureQueriesContext(connection) as queries:
+            self.user.reset_failed_login_attempts()
+        self.assert_profile_untouched(queries)
+
+    def test_login_then_verify_otp(self) -> None:
+        with self.assertNumQueries(3), CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/v1/auth/login/', {'email': self.user.email, 'password': PASSWORD},
+                                        format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assert_profile_untouched(queries)
+
+        self.user.refresh_from_db()
+        with self.assertNumQueries(2), CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/v1/auth/verify-otp/', {'otp': self.user.otp}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assert_profile_untouched(queries)
@@ -0,0 +1,59 @@
+import os
+import time
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core_apps.user_profile.onboarding import chunked, customer_file_chunks, hash_passwords, onboard_customers, \
+    password_hashing_pool, read_customer_records
+from core_apps.user_profile.tasks import onboard_customer_chunk
+
+class Command(BaseCommand):
+    help = 'Bulk onboard customers from a CSV or NDJSON file in chunks and report rows per second'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('path')
+        parser.add_argument('--chunk-size', type=int, default=settings.ONBOARDING_CHUNK_SIZE)
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Password hashing processes, defaults to the number of CPUs')
+        parser.add_argument('--celery', action='store_true',
+                            help='Queue the row ranges of each chunk to Celery workers, which read and hash their '
+                                 'own chunk. The file must be readable by the workers at the same path')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options['celery']:
+            self.queue_chunks(os.path.abspath(options['path']), options['chunk_size'])
+        else:
+            self.onboard(options['path'], options['chunk_size'], options['workers'])
+
+    def queue_chunks(self, path: str, chunk_size: int) -> None:
+        rows, chunks = 0, 0
+        started = time.perf_counter()
+        for offset, first_row, count in customer_file_chunks(path, chunk_size):
+            onboard_customer_chunk.delay(path, offset, first_row, count)
+            rows += count
+            chunks += 1
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Queued {rows} rows in {chunks} chunks in {elapsed:.1f}s, the workers log their rows/s per chunk'))
+
+    def onboard(self, path: str, chunk_size: int, workers: int) -> None:
+        rows, created, accounts, skipped = 0, 0, 0, 0
+        started = time.perf_counter()
+        with password_hashing_pool(workers) as executor:
+            for chunk in chunked(read_customer_records(path), chunk_size):
+                hash_passwords(chunk, executor)
+                result = onboard_customers(chunk, rows + 1)
+                created += result['created']
+                accounts += result['accounts']
+                skipped += len(result['errors'])
+                for error in result['errors']:
+                    self.stderr.write(f'Row {error["row"]}: {error["error"]}')
+                rows += len(chunk)
+                self.stdout.write(f'{rows} rows, {rows / (time.perf_counter() - started):.0f} rows/s')
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Onboarded {created} customers and {accounts} accounts from {rows} rows, skipped {skipped}, '
+            f'in {elapsed:.1f}s ({rows / elapsed:.0f} rows/s)'))
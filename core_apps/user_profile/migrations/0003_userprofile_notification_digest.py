@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user_profile", "0002_userprofile_account_currency_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userprofile",
+            name="notification_digest",
+            field=models.BooleanField(default=False, verbose_name="Notification Digest"),
+        ),
+    ]
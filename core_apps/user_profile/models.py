@@ -76,6 +76,7 @@ class UserProfile(TimeStampedModel):
                                         choices=BankAccount.AccountCurrency.choices)
     account_type = models.CharField(_('Account Type'), max_length=10, null=True, blank=True,
                                         choices=BankAccount.BankAccountType.choices)
+    notification_digest = models.BooleanField(_('Notification Digest'), default=False)
     
     photo = CloudinaryField(_('Photo'), blank=True, null=True)
     photo_url = models.URLField(_('Photo URL'), blank=True, null=True)
@@ -0,0 +1,229 @@
+import csv
+import json
+from collections import defaultdict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import islice
+from multiprocessing import get_context
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from loguru import logger
+
+from core_apps.accounts.emails import account_creation_email
+from core_apps.accounts.models import BankAccount
+from core_apps.accounts.utils import account_number_prefix, account_numbers
+from core_apps.common.outbox import enqueue_emails
+from core_apps.user_auth.managers import generate_username, validate_email_address
+
+from .models import UserProfile
+
+User = get_user_model()
+
+HASH_CHUNK_SIZE = 32
+ONBOARDING_ATTEMPTS = 3
+USER_FIELDS = ['first_name', 'middle_name', 'last_name', 'id_no', 'security_question', 'security_answer']
+PROFILE_FIELDS = [
+    'title', 'gender', 'date_of_birth', 'country_of_birth', 'place_of_birth', 'martial_status',
+    'identification_type', 'id_issue_date', 'id_expiry_date', 'passport_number', 'nationality', 'phone_number',
+    'address', 'city', 'country', 'employment_status', 'employer_name', 'annual_income', 'date_of_employment',
+    'employer_address', 'employer_city', 'employer_state', 'account_currency', 'account_type',
+]
+
+def record_lines(customer_file: BinaryIO) -> Iterator[str]:
+    for line in iter(customer_file.readline, b''):
+        yield line.decode('utf-8')
+
+def parse_customer_records(path: str, customer_file: BinaryIO,
+                           offset: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    lines = record_lines(customer_file)
+    if path.endswith(('.ndjson', '.jsonl')):
+        customer_file.seek(offset or 0)
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        header = next(csv.reader(lines))
+        if offset is not None:
+            customer_file.seek(offset)
+        yield from csv.DictReader(lines, fieldnames=header)
+
+def read_customer_records(path: str, offset: Optional[int] = None,
+                          limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Stream customer records from a CSV file with a header row, or from an
+    NDJSON file when ``path`` ends in ``.ndjson`` or ``.jsonl``, starting at
+    the byte ``offset`` of a record boundary found by ``customer_file_chunks``.
+    """
+    with open(path, 'rb') as customer_file:
+        yield from islice(parse_customer_records(path, customer_file, offset), limit)
+
+def customer_file_chunks(path: str, size: int) -> Iterator[Tuple[Optional[int], int, int]]:
+    """
+    Split a customer file into ``(offset, first_row, count)`` chunks of at
+    most ``size`` records without keeping any record, so workers can each
+    read their own chunk from the file.
+    """
+    with open(path, 'rb') as customer_file:
+        offset, first_row, count = None, 1, 0
+        for _ in parse_customer_records(path, customer_file):
+            count += 1
+            if count == size:
+                yield offset, first_row, count
+                offset, first_row, count = customer_file.tell(), first_row + count, 0
+        if count:
+            yield offset, first_row, count
+
+def chunked(records: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    records = iter(records)
+    while chunk := list(islice(records, size)):
+        yield chunk
+
+def password_hashing_pool(workers: Optional[int] = None) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn'), initializer=django.setup)
+
+def hash_passwords(records: List[Dict[str, Any]], executor: Optional[Executor] = None,
+                   chunksize: int = HASH_CHUNK_SIZE) -> List[Dict[str, Any]]:
+    """
+    Replace the raw ``password`` of every record with its hash, computed in
+    ``executor`` when given so key stretching runs on every core. Records
+    without a password get an unusable one and have to reset it before
+    signing in.
+    """
+    passwords = [record.get('password') or None for record in records]
+    hashed = executor.map(make_password, passwords, chunksize=chunksize) if executor else map(make_password, passwords)
+    for record, password in zip(records, hashed):
+        record['password'] = password
+    return records
+
+def present(record: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    return {field: record[field] for field in fields if record.get(field) not in (None, '')}
+
+def build_customer(record: Dict[str, Any]) -> UserProfile:
+    email = User.objects.normalize_email(record.get('email') or '')
+    validate_email_address(email)
+    user = User(email=email, password=record['password'], **present(record, USER_FIELDS))
+    user.clean_fields(exclude=['username'])
+    profile = UserProfile(user=user, **present(record, PROFILE_FIELDS))
+    profile.clean_fields(exclude=['user'])
+    profile.clean()
+    if profile.account_currency:
+        account_number_prefix(profile.account_currency)
+    return profile
+
+def assign_usernames(users: List['User']) -> None:
+    assigned = set()
+    pending = users
+    while pending:
+        for user in pending:
+            user.username = generate_username()
+        taken = set(User.objects.filter(username__in=[user.username for user in pending])
+                    .values_list('username', flat=True))
+        retry = []
+        for user in pending:
+            if user.username in taken or user.username in assigned:
+                retry.append(user)
+            else:
+                assigned.add(user.username)
+        pending = retry
+
+def validate_customers(records: List[Dict[str, Any]], first_row: int,
+                       errors: List[Dict[str, Any]]) -> Tuple[List[UserProfile], Dict[str, int]]:
+    profiles: List[UserProfile] = []
+    rows: Dict[str, int] = {}
+    seen_id_nos = set()
+    for row, record in enumerate(records, start=first_row):
+        try:
+            profile = build_customer(record)
+        except (ValidationError, ValueError) as e:
+            errors.append({'row': row, 'error': '; '.join(e.messages) if isinstance(e, ValidationError) else str(e)})
+            continue
+        user = profile.user
+        if user.email in rows or user.id_no in seen_id_nos:
+            errors.append({'row': row, 'error': 'Duplicate email or ID number in file'})
+            continue
+        rows[user.email] = row
+        seen_id_nos.add(user.id_no)
+        profiles.append(profile)
+    return profiles, rows
+
+def exclude_existing_customers(profiles: List[UserProfile], rows: Dict[str, int],
+                               errors: List[Dict[str, Any]]) -> List[UserProfile]:
+    if not profiles:
+        return profiles
+    existing = list(User.objects.filter(Q(email__in=[profile.user.email for profile in profiles]) |
+                                        Q(id_no__in=[profile.user.id_no for profile in profiles]))
+                    .values_list('email', 'id_no'))
+    taken_emails = {email for email, _ in existing}
+    taken_id_nos = {id_no for _, id_no in existing}
+    fresh = []
+    for profile in profiles:
+        if profile.user.email in taken_emails or profile.user.id_no in taken_id_nos:
+            errors.append({'row': rows[profile.user.email], 'error': 'Customer already exists'})
+        else:
+            fresh.append(profile)
+    return fresh
+
+@transaction.atomic
+def create_customers(profiles: List[UserProfile]) -> List[BankAccount]:
+    users = [profile.user for profile in profiles]
+    assign_usernames(users)
+    User.objects.bulk_create(users)
+    UserProfile.objects.bulk_create(profiles)
+
+    by_currency = defaultdict(list)
+    for profile in profiles:
+        if profile.account_currency:
+            by_currency[profile.account_currency].append(profile)
+    accounts = []
+    for currency, holders in by_currency.items():
+        numbers = account_numbers.take(account_number_prefix(currency), len(holders))
+        for profile, account_number in zip(holders, numbers):
+            accounts.append(BankAccount(
+                user=profile.user,
+                account_number=account_number,
+                account_type=profile.account_type or BankAccount.BankAccountType.CURRENT,
+                account_currency=currency,
+                is_primary=True,
+            ))
+    BankAccount.objects.bulk_create(accounts)
+    if accounts:
+        enqueue_emails([account_creation_email(account.user, account) for account in accounts])
+    return accounts
+
+def onboard_customers(records: List[Dict[str, Any]], first_row: int = 1) -> Dict[str, Any]:
+    """
+    Create the users, profiles and primary bank accounts of a chunk of
+    customer records in one transaction with a handful of bulk queries,
+    bypassing the per-row ``post_save`` signals. ``password`` must already be
+    hashed (see ``hash_passwords``). Records that fail validation, repeat an
+    email or ID number, or match an existing user are skipped and reported by
+    row number. Account numbers are taken from the shared block pool and the
+    welcome emails are queued to the outbox together.
+
+    A chunk running alongside another that holds the same customer loses the
+    race on the unique constraints. Its transaction is then rolled back and
+    retried against the committed rows, so the clash is reported as an
+    existing customer. If it still fails after ``ONBOARDING_ATTEMPTS``
+    attempts, every remaining row is reported with the error.
+    """
+    errors = []
+    profiles, rows = validate_customers(records, first_row, errors)
+    accounts = []
+    for attempt in range(1, ONBOARDING_ATTEMPTS + 1):
+        profiles = exclude_existing_customers(profiles, rows, errors)
+        try:
+            accounts = create_customers(profiles)
+            break
+        except IntegrityError as e:
+            logger.warning(f'Onboarding chunk from row {first_row} clashed with concurrent inserts, '
+                           f'attempt {attempt}: {e}')
+            if attempt == ONBOARDING_ATTEMPTS:
+                errors.extend({'row': rows[profile.user.email], 'error': str(e)} for profile in profiles)
+                profiles = []
+    errors.sort(key=lambda error: error['row'])
+    return {'processed': len(records), 'created': len(profiles), 'accounts': len(accounts), 'errors': errors}
@@ -70,7 +70,8 @@ class UserProfileSerializer(serializers.ModelSerializer):
             'nationality', 'phone_number', 'address', 'city', 'country', 'employment_status', 'employer_name',
             'annual_income', 'date_of_employment', 'employer_address', 'employer_city', 'employer_state',
             'next_of_kin', 'created_at', 'updated_at', 'photo', 'photo_url', 'id_photo', 'id_photo_url',
-            'signature_photo','signature_photo_url', 'view_count', 'account_currency', 'account_type'
+            'signature_photo','signature_photo_url', 'view_count', 'account_currency', 'account_type',
+            'notification_digest'
         )
         read_only_fields = ('user', 'id', 'username', 'email', 'created_at', 'updated_at')
 
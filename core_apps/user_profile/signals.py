@@ -13,6 +13,6 @@ def create_user_profile(sender: Type[Model], instance: Model, created: bool, **k
     if created:
         logger.info('Creating user profile for new user')
         UserProfile.objects.create(user=instance)
-    else:
+    elif kwargs.get('update_fields') is None:
         logger.info('Updating user profile for existing user')
         instance.profile.save()
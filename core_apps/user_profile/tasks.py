@@ -1,4 +1,6 @@
 import base64
+import time
+from typing import Optional
 from uuid import UUID
 
 import cloudinary.uploader
@@ -7,6 +9,8 @@ from django.apps import apps
 from django.core.files.storage import default_storage
 from loguru import logger
 
+from .onboarding import hash_passwords, onboard_customers, read_customer_records
+
 @shared_task(name = 'upload image to cloudinary')
 def upload_image_to_cloudinary(profile_id: UUID, images: dict) -> None:
     try:
@@ -34,3 +38,16 @@ def upload_image_to_cloudinary(profile_id: UUID, images: dict) -> None:
         if image_data in images.values():
             if image_data['type'] == 'file' and default_storage.exists(image_data['path']):
                 default_storage.delete(image_data['path'])
+
+@shared_task
+def onboard_customer_chunk(path: str, offset: Optional[int], first_row: int, count: int) -> str:
+    started = time.perf_counter()
+    records = hash_passwords(list(read_customer_records(path, offset, count)))
+    result = onboard_customers(records, first_row)
+    elapsed = time.perf_counter() - started
+    for error in result['errors']:
+        logger.warning(f'Onboarding row {error["row"]} skipped: {error["error"]}')
+    logger.info(f'Onboarded {result["created"]} of {result["processed"]} customers from row {first_row} '
+                f'at {result["processed"] / elapsed:.0f} rows/s')
+    return f'Created {result["created"]} customers and {result["accounts"]} accounts, ' \
+           f'skipped {len(result["errors"])} rows'